@@ -12,6 +12,29 @@ class Settings(BaseSettings):
 
     # Gemini
     GEMINI_API_KEY: str = ""
+    # Optional pool of keys to spread load over, as a JSON list in the env
+    # (e.g. GEMINI_API_KEYS='["key1","key2"]'); defaults to [GEMINI_API_KEY]
+    GEMINI_API_KEYS: list[str] = []
+    # Models raced per request before falling back to the rest one by one
+    GEMINI_PARALLEL_MODELS: int = 2
+    # Cap on in-flight Gemini requests per API key
+    GEMINI_MAX_CONCURRENCY: int = 16
+    # How long a key that got a 429 is kept out of rotation
+    GEMINI_KEY_COOLDOWN_SECONDS: int = 30
+    # Requests per minute allowed per API key (0 = no client-side limit)
+    GEMINI_KEY_RPM: int = 0
+
+    # Max in-flight requests for grammar_feedback_batch
+    GRAMMAR_BATCH_CONCURRENCY: int = 4
+
+    # Exact-match prompt -> reply cache size
+    PROMPT_CACHE_MAX_ENTRIES: int = 2048
+
+    # Semantic reply cache (needs sentence-transformers; uses EMBEDDING_MODEL)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2048
+    SEMANTIC_CACHE_TTL_SECONDS: int = 3600
 
     # DeepSeek (OpenAI-compatible API)
     DEEPSEEK_API_KEY: str = ""
@@ -11,13 +11,42 @@ sentry_sdk.init(
     profiles_sample_rate=1.0,
 )
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.core.router_register import register_routers
+from app.utils import gemini_client, intonation_utils
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up heavy models before serving, so the first request does not pay
+    # for loading them. A failure here only costs that first-request latency.
+    try:
+        await asyncio.to_thread(intonation_utils.warmup)
+        await gemini_client.warmup()
+    except Exception as e:
+        logger.warning("[startup] Warmup failed: %s", e)
+    yield
+    await gemini_client.aclose()
+
 
 # Initialize FastAPI app with settings
-app = FastAPI(title=settings.APP_NAME, version=settings.VERSION, root_path="/api/v1")
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.VERSION,
+    root_path="/api/v1",
+    # orjson keeps large payloads (base64 audio) off the pure-Python json encoder
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 origins = ["http://localhost:5173", "http://localhost:5174"]
 
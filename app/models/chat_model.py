@@ -1,8 +1,37 @@
+import threading
 import uuid
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import List, Optional
 
-from app.schemas.chat_schema import ChatInitConfig, ChatMessage
+from cachetools import TTLCache
+
+from app.schemas.chat_schema import ChatMessage, SpeakingConfig
+
+_BASE_INSTRUCTION = (
+    "You are an English speaking practice partner. "
+    "Keep responses concise and conversational. "
+    "Always respond in English, and encourage the learner."
+)
+
+# Sentence templates for the SpeakingConfig fields, in prompt order (see
+# _config_values)
+_SYSTEM_TEMPLATES = (
+    "Scenario: {}.",
+    "Learner level: {}.",
+    "User role: {}.",
+    "Bot tone: {}.",
+    "Goal: {}.",
+)
+
+
+def _config_values(config: SpeakingConfig) -> tuple:
+    return (
+        config.scenario,
+        config.level,
+        config.userRole,
+        config.botTone,
+        config.goal,
+    )
 
 
 @dataclass
@@ -10,47 +39,52 @@ class ChatState:
     session_id: str
     title: str
     type: str
-    config: ChatInitConfig
+    config: SpeakingConfig
     messages: List[ChatMessage] = field(default_factory=list)
     user_name: Optional[str] = None
 
 
 class InMemoryChatStore:
-    def __init__(self) -> None:
-        self._sessions: Dict[str, ChatState] = {}
+    """Per-process session store.
+
+    Sessions are evicted once idle for ``ttl_seconds`` (every get_session
+    re-stores the entry, restarting its TTL), or least-recently-used first
+    once ``max_sessions`` is reached, so memory stays bounded for the
+    lifetime of the worker.
+    """
+
+    def __init__(self, max_sessions: int = 10_000, ttl_seconds: int = 3 * 3600) -> None:
+        self._sessions: TTLCache[str, ChatState] = TTLCache(
+            maxsize=max_sessions, ttl=ttl_seconds
+        )
+        # TTLCache is not thread-safe; sync routes run in the threadpool.
+        self._lock = threading.RLock()
 
     def create_session(
-        self, title: str, type_: str, config: ChatInitConfig
+        self, title: str, type_: str, config: SpeakingConfig
     ) -> ChatState:
         session_id = str(uuid.uuid4())
         state = ChatState(session_id=session_id, title=title, type=type_, config=config)
 
-        system_parts: list[str] = []
-        if config.scenario:
-            system_parts.append(f"Scenario: {config.scenario}.")
-        if config.level:
-            system_parts.append(f"Learner level: {config.level}.")
-        if config.user_role:
-            system_parts.append(f"User role: {config.user_role}.")
-        if config.bot_tone:
-            system_parts.append(f"Bot tone: {config.bot_tone}.")
-        if config.goal:
-            system_parts.append(f"Goal: {config.goal}.")
-
-        base_instruction = (
-            "You are an English speaking practice partner. "
-            "Keep responses concise and conversational. "
-            "Always respond in English, and encourage the learner."
-        )
-
-        system_content = base_instruction + " " + " ".join(system_parts)
+        system_parts = [
+            template.format(value)
+            for template, value in zip(_SYSTEM_TEMPLATES, _config_values(config))
+            if value
+        ]
+        system_content = _BASE_INSTRUCTION + " " + " ".join(system_parts)
         state.messages.append(ChatMessage(role="system", content=system_content))
 
-        self._sessions[session_id] = state
+        with self._lock:
+            self._sessions[session_id] = state
         return state
 
     def get_session(self, session_id: str) -> Optional[ChatState]:
-        return self._sessions.get(session_id)
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None:
+                # TTLCache counts from insertion; re-storing makes it idle time.
+                self._sessions[session_id] = state
+            return state
 
 
 chat_store = InMemoryChatStore()
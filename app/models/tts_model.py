@@ -0,0 +1,40 @@
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from cachetools import TTLCache
+
+
+@dataclass(frozen=True)
+class PendingTTS:
+    text: str
+    voice: str
+    speaking_rate: float
+
+
+class InMemoryTTSStore:
+    """One-shot holder for bot replies whose audio is streamed separately.
+
+    Entries are keyed by an unguessable uuid4, removed on first fetch, and
+    expire after ``ttl_seconds`` if the client never asks for them.
+    """
+
+    def __init__(self, max_items: int = 10_000, ttl_seconds: int = 10 * 60) -> None:
+        self._items: TTLCache[str, PendingTTS] = TTLCache(
+            maxsize=max_items, ttl=ttl_seconds
+        )
+        self._lock = threading.RLock()
+
+    def put(self, item: PendingTTS) -> str:
+        audio_id = str(uuid.uuid4())
+        with self._lock:
+            self._items[audio_id] = item
+        return audio_id
+
+    def pop(self, audio_id: str) -> Optional[PendingTTS]:
+        with self._lock:
+            return self._items.pop(audio_id, None)
+
+
+tts_store = InMemoryTTSStore()
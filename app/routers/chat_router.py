@@ -1,26 +1,58 @@
-from fastapi import APIRouter
+import asyncio
+from typing import AsyncIterator, List, Optional
 
-from app.schemas.chat_schema import (ChatMessage, ChatTurnRequest,
-                                     ChatTurnResponse, Feedback, Mistake,
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.models.tts_model import PendingTTS, tts_store
+from app.schemas.chat_schema import (ChatMessage, ChatReplyRequest,
+                                     ChatTurnRequest, ChatTurnResponse,
+                                     Feedback, Mistake, SpeakingConfig,
                                      TurnResponse)
 from app.services import (build_system_message_from_config,
                           calculate_transcript_similarity, get_tts_parameters)
+from app.utils.audio_utils import WavFormatError, parse_wav
 from app.utils.azure_speech import (decode_base64_to_wav,
-                                    pronunciation_assessment_from_file,
-                                    stt_from_audio_file, tts_to_wav_base64)
+                                    pronunciation_assessment_from_wav_bytes,
+                                    stt_from_wav_bytes, tts_to_wav_base64,
+                                    tts_wav_stream)
 from app.utils.gemini_client import (generate_gemini_response,
-                                     grammar_feedback_from_gemini)
+                                     grammar_feedback_from_gemini,
+                                     stream_gemini_response)
 from app.utils.intonation_utils import (calculate_intonation_score,
                                         pitch_per_word)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["Chat / Speaking Conversation"])
 
 
+def _llm_messages(
+    context: List[ChatMessage], user_text: str, config: Optional[SpeakingConfig]
+) -> List[ChatMessage]:
+    messages = list(context)
+    messages.append(ChatMessage.model_construct(role="user", content=user_text))
+
+    # Prepend a system message synthesized from config if provided
+    if config:
+        messages.insert(0, build_system_message_from_config(config))
+    return messages
+
+
 @router.post("/turn", response_model=ChatTurnResponse)
-async def process_chat_turn(req: ChatTurnRequest) -> ChatTurnResponse:
-    # 1. Decode audio and run Azure STT
-    audio_path = decode_base64_to_wav(req.audio_base64)
-    azure_transcript = stt_from_audio_file(audio_path, language="en-US").strip()
+async def process_chat_turn(req: ChatTurnRequest, request: Request) -> ChatTurnResponse:
+    # 1. Decode and parse the audio once (STT, pronunciation and intonation all
+    # read the parsed frames), then run Azure STT
+    wav_bytes = decode_base64_to_wav(req.audio_base64)
+    try:
+        wav = parse_wav(wav_bytes)
+    except WavFormatError as e:
+        raise HTTPException(status_code=400, detail=f"Unsupported audio: {e}")
+    azure_transcript = (
+        await asyncio.to_thread(stt_from_wav_bytes, wav, language="en-US")
+    ).strip()
 
     # 2. Choose transcript to use, based on similarity with user_transcript
     user_txt = (req.user_transcript or "").strip()
@@ -35,18 +67,24 @@ async def process_chat_turn(req: ChatTurnRequest) -> ChatTurnResponse:
         else:
             chosen_transcript = azure_transcript
 
+    # Response objects below use model_construct(), so they are never validated:
+    # FastAPI passes an instance of the response_model class through as is.
+    # That is safe because every field is coerced upstream (scores via float(),
+    # LLM text and feedback items via str() and the Literal checks in
+    # gemini_client), so the values always match the schema.
+
     # 3. If unintelligible -> return quick feedback, no PA/intonation/LLM
     if is_unintelligible or not chosen_transcript:
-        feedback = Feedback(
-            pronunciation_score=0,
-            fluency_score=0,
-            intonation_score=0,
-            grammar_score=0,
-            total_score=0,
+        feedback = Feedback.model_construct(
+            pronunciation_score=0.0,
+            fluency_score=0.0,
+            intonation_score=0.0,
+            grammar_score=0.0,
+            total_score=0.0,
             improvement_tip="I couldn't clearly understand this sentence. Please speak a bit slower and more clearly.",
             mistakes=[],
         )
-        turn = TurnResponse(
+        turn = TurnResponse.model_construct(
             feedback=feedback,
             bot_text="I had trouble understanding you. Could you repeat that more slowly?",
             bot_translation="Tôi hơi khó nghe rõ. Bạn có thể nói lại chậm hơn không?",
@@ -54,46 +92,45 @@ async def process_chat_turn(req: ChatTurnRequest) -> ChatTurnResponse:
             user_translation=None,
             is_unintelligible=True,
         )
-        return ChatTurnResponse(turn=turn)
+        return ChatTurnResponse.model_construct(turn=turn)
 
-    # 4. Pronunciation Assessment using Azure
-    accuracy, completeness, fluency, per_word_eval, final_words = (
-        pronunciation_assessment_from_file(
-            filename=audio_path,
-            language="en-US",
-            reference_text=chosen_transcript,
-        )
-    )
+    # 4-6. Pronunciation assessment (Azure), intonation (Praat), grammar feedback
+    # and the conversational reply (Gemini) only depend on the chosen transcript
+    # and the audio, so run them concurrently instead of back to back.
+    messages = _llm_messages(req.context, chosen_transcript, req.config)
 
-    # 5. Calculate intonation score based on pitch range and variation (native comparison)
-    intonation_score = calculate_intonation_score(audio_path)
-
-    # 6. Build LLM (Gemini) feedback prompt based on speaking_evaluation.py style
-    # 6a. Ask Gemini for grammar feedback and user translation on the chosen transcript.
     (
-        grammar_score,
-        grammar_tip,
-        mistakes,
-        user_translation,
-        vocab_suggestions,
-        grammar_breakdown,
-    ) = grammar_feedback_from_gemini(
-        chosen_transcript,
-        source_lang="en",
-        target_lang="vi",
+        (accuracy, completeness, fluency, per_word_eval, final_words),
+        intonation_score,
+        (
+            grammar_score,
+            grammar_tip,
+            mistakes,
+            user_translation,
+            vocab_suggestions,
+            grammar_breakdown,
+        ),
+        (bot_text, bot_translation),
+    ) = await asyncio.gather(
+        # 4. Pronunciation Assessment using Azure
+        asyncio.to_thread(
+            pronunciation_assessment_from_wav_bytes,
+            wav_bytes=wav,
+            language="en-US",
+            reference_text=chosen_transcript,
+        ),
+        # 5. Intonation score based on pitch range and variation (native comparison)
+        asyncio.to_thread(calculate_intonation_score, wav),
+        # 6a. Grammar feedback and user translation on the chosen transcript
+        grammar_feedback_from_gemini(
+            chosen_transcript,
+            source_lang="en",
+            target_lang="vi",
+        ),
+        # 6b. Conversational bot reply using full context, config, plus its translation
+        generate_gemini_response(messages, target_lang="vi"),
     )
 
-    # 6b. Get conversational bot reply from Gemini using full context, config, plus its translation.
-    messages = list(req.context)
-    messages.append(ChatMessage(role="user", content=chosen_transcript))
-
-    # Prepend a system message synthesized from config if provided
-    if req.config:
-        system_message = build_system_message_from_config(req.config)
-        messages.insert(0, system_message)
-
-    bot_text, bot_translation = generate_gemini_response(messages, target_lang="vi")
-
     # 7. Map to Feedback structure: Azure scores + grammar + normalized intonation.
     # Total score is a simple average of pronunciation, fluency, grammar, and intonation.
     pronunciation_score = round(float(accuracy), 1)
@@ -106,7 +143,7 @@ async def process_chat_turn(req: ChatTurnRequest) -> ChatTurnResponse:
         1,
     )
 
-    feedback = Feedback(
+    feedback = Feedback.model_construct(
         pronunciation_score=pronunciation_score,
         fluency_score=fluency_score,
         intonation_score=intonation_score,
@@ -118,17 +155,25 @@ async def process_chat_turn(req: ChatTurnRequest) -> ChatTurnResponse:
         grammar_breakdown=grammar_breakdown,
     )
 
-    # 8. Generate Azure TTS audio for the bot's reply (WAV -> base64)
-    try:
-        voice, speaking_rate = get_tts_parameters(req.config)
-        bot_audio_base64 = tts_to_wav_base64(
-            bot_text, voice=voice, speaking_rate=speaking_rate
+    # 8. Generate Azure TTS audio for the bot's reply: either hand out a one-shot
+    # URL that streams it, or inline it as base64 WAV.
+    voice, speaking_rate = get_tts_parameters(req.config)
+    bot_audio_base64 = None
+    bot_audio_url = None
+    if req.stream_audio:
+        audio_id = tts_store.put(
+            PendingTTS(text=bot_text, voice=voice, speaking_rate=speaking_rate)
         )
-    except Exception as e:
-        print("[process_chat_turn] TTS error:", e)
-        bot_audio_base64 = None
-
-    turn = TurnResponse(
+        bot_audio_url = str(request.url_for("stream_turn_audio", audio_id=audio_id))
+    else:
+        try:
+            bot_audio_base64 = await asyncio.to_thread(
+                tts_to_wav_base64, bot_text, voice=voice, speaking_rate=speaking_rate
+            )
+        except Exception:
+            logger.exception("[process_chat_turn] TTS error")
+
+    turn = TurnResponse.model_construct(
         feedback=feedback,
         bot_text=bot_text,
         bot_translation=bot_translation,
@@ -136,6 +181,51 @@ async def process_chat_turn(req: ChatTurnRequest) -> ChatTurnResponse:
         user_translation=user_translation,
         is_unintelligible=False,
         bot_audio_base64=bot_audio_base64,
+        bot_audio_url=bot_audio_url,
     )
 
-    return ChatTurnResponse(turn=turn)
+    return ChatTurnResponse.model_construct(turn=turn)
+
+
+@router.get("/turn/audio/{audio_id}", name="stream_turn_audio")
+def stream_turn_audio(audio_id: str) -> StreamingResponse:
+    """Stream the bot reply audio of a turn; each URL can be fetched once."""
+    pending = tts_store.pop(audio_id)
+    if pending is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+
+    try:
+        chunks = tts_wav_stream(
+            pending.text, voice=pending.voice, speaking_rate=pending.speaking_rate
+        )
+    except Exception as e:
+        logger.error("[stream_turn_audio] TTS error: %s", e)
+        raise HTTPException(status_code=502, detail="Speech synthesis failed")
+
+    return StreamingResponse(chunks, media_type="audio/wav")
+
+
+@router.post("/reply/stream")
+async def stream_chat_reply(req: ChatReplyRequest) -> StreamingResponse:
+    """Stream the bot reply as server-sent events.
+
+    Emits a ``bot_text`` event as soon as the model has produced it and a
+    ``bot_translation`` event once the translation is complete, each with a
+    JSON payload such as ``{"bot_text": "..."}``.
+    """
+    messages = _llm_messages(req.context, req.user_text.strip(), req.config)
+
+    async def events() -> AsyncIterator[bytes]:
+        async for field, value in stream_gemini_response(
+            messages, target_lang=req.target_lang
+        ):
+            yield b"event: %s\ndata: %s\n\n" % (
+                field.encode(),
+                orjson.dumps({field: value}),
+            )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -27,6 +27,17 @@ class ChatTurnRequest(BaseModel):
     user_transcript: Optional[str] = None
     # Optional speaking configuration from the Node service
     config: Optional[SpeakingConfig] = None
+    # If true, bot audio is not inlined; fetch it from turn.bot_audio_url instead
+    stream_audio: bool = False
+
+
+class ChatReplyRequest(BaseModel):
+    # Conversation so far, without the learner's new message
+    context: list[ChatMessage]
+    # The learner's new message (already transcribed)
+    user_text: str
+    config: Optional[SpeakingConfig] = None
+    target_lang: str = "vi"
 
 
 class Mistake(BaseModel):
@@ -75,6 +86,8 @@ class TurnResponse(BaseModel):
     is_unintelligible: bool = False
     # Optional WAV audio (base64) synthesized for bot_text
     bot_audio_base64: Optional[str] = None
+    # One-shot URL streaming the WAV for bot_text (set when stream_audio=true)
+    bot_audio_url: Optional[str] = None
 
 
 class ChatTurnResponse(BaseModel):
@@ -3,15 +3,32 @@ Business logic for chat/speaking conversation processing.
 Separated from routers for better maintainability and testability.
 """
 
-from difflib import SequenceMatcher
 from typing import Optional, Tuple
 
+from rapidfuzz import fuzz
+
 from app.schemas.chat_schema import ChatMessage, SpeakingConfig
 
+_SYSTEM_MESSAGE_INTRO = (
+    "You are an English speaking partner helping the learner practice conversation."
+)
+
+# (SpeakingConfig attribute, sentence template) in prompt order
+_SYSTEM_MESSAGE_FIELDS = (
+    ("scenario", "Scenario: {}."),
+    ("level", "Learner level: {}."),
+    ("userRole", "Learner role: {}."),
+    ("botTone", "Your tone: {}."),
+    ("goal", "Conversation goal: {}."),
+    ("durationMinutes", "Target duration: {} minutes."),
+    ("botSpeed", "Your speaking speed should be: {}."),
+)
+
 
 def calculate_transcript_similarity(text1: str, text2: str) -> float:
     """
-    Calculate similarity between two transcripts using SequenceMatcher.
+    Calculate similarity between two transcripts using RapidFuzz's normalized
+    Indel ratio (same 0..1 scale as difflib's SequenceMatcher.ratio).
 
     Args:
         text1: First transcript
@@ -20,7 +37,7 @@ def calculate_transcript_similarity(text1: str, text2: str) -> float:
     Returns:
         Similarity ratio from 0.0 to 1.0
     """
-    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+    return fuzz.ratio(text1.lower(), text2.lower()) / 100.0
 
 
 def build_system_message_from_config(config: SpeakingConfig) -> ChatMessage:
@@ -33,25 +50,13 @@ def build_system_message_from_config(config: SpeakingConfig) -> ChatMessage:
     Returns:
         ChatMessage with role="system" containing configuration context
     """
-    system_parts: list[str] = [
-        "You are an English speaking partner helping the learner practice conversation.",
+    # Empty strings are skipped, but durationMinutes=0 is still a real value.
+    system_parts = [_SYSTEM_MESSAGE_INTRO] + [
+        template.format(value)
+        for attr, template in _SYSTEM_MESSAGE_FIELDS
+        if (value := getattr(config, attr)) not in (None, "")
     ]
 
-    if config.scenario:
-        system_parts.append(f"Scenario: {config.scenario}.")
-    if config.level:
-        system_parts.append(f"Learner level: {config.level}.")
-    if config.userRole:
-        system_parts.append(f"Learner role: {config.userRole}.")
-    if config.botTone:
-        system_parts.append(f"Your tone: {config.botTone}.")
-    if config.goal:
-        system_parts.append(f"Conversation goal: {config.goal}.")
-    if config.durationMinutes is not None:
-        system_parts.append(f"Target duration: {config.durationMinutes} minutes.")
-    if config.botSpeed:
-        system_parts.append(f"Your speaking speed should be: {config.botSpeed}.")
-
     return ChatMessage(role="system", content=" ".join(system_parts))
 
 
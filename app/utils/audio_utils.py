@@ -0,0 +1,132 @@
+import struct
+from dataclasses import dataclass
+from typing import Union
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(ValueError):
+    """The payload is not a WAV file this service can decode."""
+
+
+@dataclass(frozen=True)
+class WavAudio:
+    """Raw PCM frames and format of an in-memory WAV payload."""
+
+    frames: bytes
+    sample_rate: int
+    sample_width: int  # bytes per sample
+    channels: int
+    is_float: bool = False  # IEEE float samples instead of integer PCM
+
+    @property
+    def bits_per_sample(self) -> int:
+        return self.sample_width * 8
+
+    def to_float_samples(self) -> np.ndarray:
+        """Return samples scaled to [-1, 1] with shape (channels, n_samples)."""
+        if self.is_float:
+            dtype = "<f4" if self.sample_width == 4 else "<f8"
+            data = np.frombuffer(self.frames, dtype=dtype).astype(np.float64)
+        elif self.sample_width == 1:
+            # 8-bit WAV is unsigned
+            data = (
+                np.frombuffer(self.frames, dtype=np.uint8).astype(np.float64) - 128.0
+            ) / 128.0
+        elif self.sample_width == 2:
+            data = np.frombuffer(self.frames, dtype="<i2").astype(np.float64) / 32768.0
+        elif self.sample_width == 3:
+            raw = np.frombuffer(self.frames, dtype=np.uint8).reshape(-1, 3)
+            packed = (
+                raw[:, 0].astype(np.int32)
+                | (raw[:, 1].astype(np.int32) << 8)
+                | (raw[:, 2].astype(np.int32) << 16)
+            )
+            # Sign-extend the 24-bit values
+            data = ((packed << 8) >> 8).astype(np.float64) / 8388608.0
+        else:
+            data = (
+                np.frombuffer(self.frames, dtype="<i4").astype(np.float64)
+                / 2147483648.0
+            )
+        return data.reshape(-1, self.channels).T
+
+    def to_pcm16(self) -> bytes:
+        """Return the frames as interleaved 16-bit PCM (what Azure expects)."""
+        if not self.is_float and self.sample_width == 2:
+            return self.frames
+        samples = np.clip(self.to_float_samples().T.reshape(-1), -1.0, 1.0)
+        return (samples * 32767.0).astype("<i2").tobytes()
+
+
+def parse_wav(wav_bytes: bytes) -> WavAudio:
+    """Parse a WAV payload without touching the filesystem.
+
+    Handles integer PCM (8/16/24/32-bit) and IEEE float (32/64-bit), with the
+    plain or the WAVE_FORMAT_EXTENSIBLE header, which the stdlib ``wave``
+    module rejects. Raises WavFormatError for anything else.
+    """
+    if len(wav_bytes) < 12 or wav_bytes[:4] != b"RIFF" or wav_bytes[8:12] != b"WAVE":
+        raise WavFormatError("Not a RIFF/WAVE payload")
+
+    fmt = None
+    frames = None
+    offset = 12
+    while offset + 8 <= len(wav_bytes):
+        chunk_id = wav_bytes[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", wav_bytes, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = wav_bytes[body : body + chunk_size]
+        elif chunk_id == b"data":
+            # Streamed WAVs may leave the data size at 0 or 0xFFFFFFFF.
+            if chunk_size in (0, 0xFFFFFFFF):
+                frames = wav_bytes[body:]
+            else:
+                frames = wav_bytes[body : body + chunk_size]
+            break
+        offset = body + chunk_size + (chunk_size & 1)  # chunks are word-aligned
+
+    if fmt is None or len(fmt) < 16 or frames is None:
+        raise WavFormatError("WAV payload has no fmt or data chunk")
+
+    format_tag, channels, sample_rate, _, _, bits = struct.unpack_from(
+        "<HHIIHH", fmt
+    )
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        if len(fmt) < 26:
+            raise WavFormatError("Truncated WAVE_FORMAT_EXTENSIBLE header")
+        # The first two bytes of the sub-format GUID hold the actual format tag.
+        (format_tag,) = struct.unpack_from("<H", fmt, 24)
+
+    if channels < 1 or sample_rate < 1:
+        raise WavFormatError("Invalid WAV format header")
+    sample_width = bits // 8
+    if format_tag == WAVE_FORMAT_PCM and bits in (8, 16, 24, 32):
+        is_float = False
+    elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        is_float = True
+    else:
+        raise WavFormatError(
+            f"Unsupported WAV encoding: format {format_tag:#06x}, {bits}-bit"
+        )
+
+    frame_size = sample_width * channels
+    return WavAudio(
+        frames=frames[: len(frames) - len(frames) % frame_size],
+        sample_rate=sample_rate,
+        sample_width=sample_width,
+        channels=channels,
+        is_float=is_float,
+    )
+
+
+def as_wav_audio(audio: Union[bytes, WavAudio]) -> WavAudio:
+    """Parse WAV bytes, passing an already parsed WavAudio through as is."""
+    if isinstance(audio, WavAudio):
+        return audio
+    return parse_wav(audio)
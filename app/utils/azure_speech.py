@@ -1,10 +1,18 @@
 import base64
-from pathlib import Path
-from typing import Tuple
+import functools
+import string
+import threading
+from typing import Iterator, Tuple, Union
 
 import azure.cognitiveservices.speech as speechsdk
+import orjson
+from rapidfuzz.distance import Levenshtein
 
 from app.core.config import settings
+from app.utils.audio_utils import WavAudio, as_wav_audio
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 def _get_speech_config() -> speechsdk.SpeechConfig:
@@ -17,10 +25,54 @@ def _get_speech_config() -> speechsdk.SpeechConfig:
     return speech_config
 
 
-def stt_from_audio_file(path: str, language: str = "en-US") -> str:
+# SpeechConfig objects are only read once built, so one per language/voice can
+# be shared by every recognizer/synthesizer instead of being rebuilt per turn.
+# Recognizers and synthesizers stay per call: their audio config differs per
+# input, and a shared synthesizer would queue concurrent requests.
+@functools.lru_cache(maxsize=8)
+def _recognition_config(language: str) -> speechsdk.SpeechConfig:
     speech_config = _get_speech_config()
     speech_config.speech_recognition_language = language
-    audio_config = speechsdk.audio.AudioConfig(filename=path)
+    return speech_config
+
+
+@functools.lru_cache(maxsize=16)
+def _synthesis_config(voice: str) -> speechsdk.SpeechConfig:
+    speech_config = _get_speech_config()
+    speech_config.speech_synthesis_voice_name = voice
+    # In-memory results only carry a RIFF header for riff-* formats.
+    speech_config.set_speech_synthesis_output_format(
+        speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
+    )
+    return speech_config
+
+
+def _audio_config_from_wav(
+    wav_bytes: Union[bytes, WavAudio],
+) -> speechsdk.audio.AudioConfig:
+    """Feed in-memory WAV audio (bytes or already parsed) to Azure through a
+    push stream.
+
+    A push stream can only be consumed once, so build one per recognizer.
+    """
+    wav = as_wav_audio(wav_bytes)
+    # Push streams take integer PCM; 24-bit and float uploads are converted.
+    stream_format = speechsdk.audio.AudioStreamFormat(
+        samples_per_second=wav.sample_rate,
+        bits_per_sample=16,
+        channels=wav.channels,
+    )
+    push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+    push_stream.write(wav.to_pcm16())
+    push_stream.close()
+    return speechsdk.audio.AudioConfig(stream=push_stream)
+
+
+def stt_from_wav_bytes(
+    wav_bytes: Union[bytes, WavAudio], language: str = "en-US"
+) -> str:
+    audio_config = _audio_config_from_wav(wav_bytes)
+    speech_config = _recognition_config(language)
     recognizer = speechsdk.SpeechRecognizer(
         speech_config=speech_config, audio_config=audio_config
     )
@@ -31,33 +83,21 @@ def stt_from_audio_file(path: str, language: str = "en-US") -> str:
     raise RuntimeError(f"STT failed: {result.reason}")
 
 
-def decode_base64_to_wav(audio_base64: str, out_dir: str = "tmp_audio") -> str:
-    Path(out_dir).mkdir(parents=True, exist_ok=True)
-    audio_bytes = base64.b64decode(audio_base64)
-    # simple unique name
-    path = Path(out_dir) / "speaking_turn.wav"
-    with open(path, "wb") as f:
-        f.write(audio_bytes)
-    return str(path)
+def decode_base64_to_wav(audio_base64: str) -> bytes:
+    """Decode the client's base64 WAV payload; the bytes stay in memory."""
+    return base64.b64decode(audio_base64)
 
 
-def pronunciation_assessment_from_file(
-    filename: str,
+def pronunciation_assessment_from_wav_bytes(
+    wav_bytes: Union[bytes, WavAudio],
     language: str,
     reference_text: str,
 ) -> Tuple[float, float, float, list[str], list]:
     """Wrapper around Azure PronunciationAssessment like pronounce_assessment_file.pronunciation_assessment_continuous_from_file.
     Returns (accuracy, completeness, fluency, per_word_eval, final_words).
     """
-    import difflib
-    import json
-    import string
-    import time
-
-    speech_config = speechsdk.SpeechConfig(
-        subscription=settings.AZURE_SPEECH_KEY, region=settings.AZURE_SPEECH_REGION
-    )
-    audio_config = speechsdk.audio.AudioConfig(filename=filename)
+    speech_config = _recognition_config(language)
+    audio_config = _audio_config_from_wav(wav_bytes)
 
     pronunciation_config = speechsdk.PronunciationAssessmentConfig(
         reference_text=reference_text,
@@ -73,44 +113,46 @@ def pronunciation_assessment_from_file(
     )
     pronunciation_config.apply_to(recognizer)
 
-    done = False
+    done_evt = threading.Event()
     recognized_words = []
     fluency_scores = []
     durations = []
 
     def stop_cb(evt):
-        nonlocal done
-        done = True
+        done_evt.set()
 
     def recognized(evt):
         nonlocal recognized_words, fluency_scores, durations
-        pronunciation_result = speechsdk.PronunciationAssessmentResult(evt.result)
-        recognized_words += pronunciation_result.words
-        fluency_scores.append(pronunciation_result.fluency_score)
+        # Parse the JSON result once. PronunciationAssessmentResult would parse
+        # it again and drops the word durations needed for fluency weighting.
         json_result = evt.result.properties.get(
             speechsdk.PropertyId.SpeechServiceResponse_JsonResult
         )
-        jo = json.loads(json_result)
-        nb = jo["NBest"][0]
-        durations.append(sum(int(w["Duration"]) for w in nb["Words"]))
+        nb = orjson.loads(json_result)["NBest"][0]
+        words = nb["Words"]
+        recognized_words += [
+            speechsdk.PronunciationAssessmentWordResult(w) for w in words
+        ]
+        fluency_scores.append(nb["PronunciationAssessment"]["FluencyScore"])
+        durations.append(sum(int(w["Duration"]) for w in words))
 
     recognizer.recognized.connect(recognized)
     recognizer.session_stopped.connect(stop_cb)
     recognizer.canceled.connect(stop_cb)
 
     recognizer.start_continuous_recognition()
-    while not done:
-        time.sleep(0.5)
+    done_evt.wait()
     recognizer.stop_continuous_recognition()
 
     reference_words = [
         w.strip(string.punctuation) for w in reference_text.lower().split()
     ]
-    diff = difflib.SequenceMatcher(
-        None, reference_words, [x.word.lower() for x in recognized_words]
+    # Word-level edit script (same (tag, i1, i2, j1, j2) shape as difflib), C++.
+    opcodes = Levenshtein.opcodes(
+        reference_words, [x.word.lower() for x in recognized_words]
     )
     final_words = []
-    for tag, i1, i2, j1, j2 in diff.get_opcodes():
+    for tag, i1, i2, j1, j2 in opcodes:
         if tag in ["insert", "replace"]:
             for word in recognized_words[j1:j2]:
                 if word.error_type == "None":
@@ -151,12 +193,16 @@ def pronunciation_assessment_from_file(
     return accuracy_score, completeness_score, fluency_score, per_word_eval, final_words
 
 
-import base64
-import io
-import os
-import time
-
-import azure.cognitiveservices.speech as speechsdk
+def _prosody_ssml(text: str, voice: str, speaking_rate: float) -> str:
+    return f"""
+        <speak version="1.0" xml:lang="en-US">
+          <voice name="{voice}">
+            <prosody rate="{speaking_rate:.2f}">
+              {text}
+            </prosody>
+          </voice>
+        </speak>
+        """
 
 
 def tts_to_wav_base64(
@@ -164,56 +210,91 @@ def tts_to_wav_base64(
 ) -> str:
     """
     Synthesize text to WAV audio and return as base64.
-    Saves to tmp_audio folder to avoid playing on server speaker.
+    Audio is kept in memory (no audio output config), so nothing is played on
+    the server speaker and nothing is written to disk.
     """
-    print("[tts_to_wav_base64] START, len(text) =", len(text))
-
-    speech_config = _get_speech_config()
-    speech_config.speech_synthesis_voice_name = voice
+    logger.info("[tts_to_wav_base64] START, len(text) = %s", len(text))
 
-    # Lưu vào folder tmp_audio với tên unique
-    output_dir = Path("tmp_audio")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    tmp_path = output_dir / f"tts_{int(time.time() * 1000)}.wav"
+    speech_config = _synthesis_config(voice)
 
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=str(tmp_path))
     synthesizer = speechsdk.SpeechSynthesizer(
-        speech_config=speech_config, audio_config=audio_config
+        speech_config=speech_config, audio_config=None
     )
 
     if abs(speaking_rate - 1.0) < 1e-3:
         result = synthesizer.speak_text_async(text).get()
     else:
-        ssml = f"""
-        <speak version="1.0" xml:lang="en-US">
-          <voice name="{voice}">
-            <prosody rate="{speaking_rate:.2f}">
-              {text}
-            </prosody>
-          </voice>
-        </speak>
-        """
+        ssml = _prosody_ssml(text, voice, speaking_rate)
         result = synthesizer.speak_ssml_async(ssml).get()
 
     if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        # Đọc file WAV vừa tạo
-        with open(tmp_path, "rb") as f:
-            audio_bytes = f.read()
-        print("[tts_to_wav_base64] SUCCESS, audio bytes =", len(audio_bytes))
-
-        # # Xóa file sau khi đọc xong (optional, có thể bỏ để debug)
-        # try:
-        #     os.remove(tmp_path)
-        # except Exception as e:
-        #     print(f"[tts_to_wav_base64] Warning: Could not delete {tmp_path}: {e}")
+        audio_bytes = result.audio_data
+        logger.info("[tts_to_wav_base64] SUCCESS, audio bytes = %s", len(audio_bytes))
 
         return base64.b64encode(audio_bytes).decode("utf-8")
 
     elif result.reason == speechsdk.ResultReason.Canceled:
         details = result.cancellation_details
-        print(
-            f"[tts_to_wav_base64] CANCELED: {details.reason}, {details.error_details}"
+        logger.warning(
+            "[tts_to_wav_base64] CANCELED: %s, %s",
+            details.reason,
+            details.error_details,
         )
         raise RuntimeError(f"TTS canceled: {details.reason}, {details.error_details}")
 
+    logger.warning("[tts_to_wav_base64] FAILED: %s", result.reason)
     raise RuntimeError(f"TTS failed with reason: {result.reason}")
+
+
+def _iter_audio_chunks(
+    synthesizer: speechsdk.SpeechSynthesizer,
+    stream: speechsdk.AudioDataStream,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    # Taking the synthesizer as an argument keeps it alive until the stream is drained.
+    buffer = bytes(chunk_size)
+    while True:
+        filled = stream.read_data(buffer)
+        if not filled:
+            break
+        yield buffer[:filled]
+    if stream.status == speechsdk.StreamStatus.Canceled:
+        logger.warning(
+            "[tts_wav_stream] CANCELED mid-stream: %s", stream.cancellation_details
+        )
+
+
+def tts_wav_stream(
+    text: str,
+    voice: str = "en-US-AriaNeural",
+    speaking_rate: float = 1.0,
+    chunk_size: int = 16000,
+) -> Iterator[bytes]:
+    """
+    Start synthesizing text and return an iterator of WAV chunks that yields
+    audio while Azure is still producing it (no base64, no full buffering).
+    Raises RuntimeError if synthesis does not start.
+    """
+    speech_config = _synthesis_config(voice)
+    synthesizer = speechsdk.SpeechSynthesizer(
+        speech_config=speech_config, audio_config=None
+    )
+
+    # start_speaking_* returns as soon as the first audio is available.
+    if abs(speaking_rate - 1.0) < 1e-3:
+        result = synthesizer.start_speaking_text_async(text).get()
+    else:
+        ssml = _prosody_ssml(text, voice, speaking_rate)
+        result = synthesizer.start_speaking_ssml_async(ssml).get()
+
+    if result.reason == speechsdk.ResultReason.Canceled:
+        details = result.cancellation_details
+        raise RuntimeError(f"TTS canceled: {details.reason}, {details.error_details}")
+    if result.reason not in (
+        speechsdk.ResultReason.SynthesizingAudioStarted,
+        speechsdk.ResultReason.SynthesizingAudioCompleted,
+    ):
+        raise RuntimeError(f"TTS failed with reason: {result.reason}")
+
+    stream = speechsdk.AudioDataStream(result)
+    return _iter_audio_chunks(synthesizer, stream, chunk_size)
@@ -1,7 +1,13 @@
-import json
-from typing import Any, List, Tuple
+import asyncio
+import functools
+import re
+from typing import Any, AsyncIterator, List, Optional, Tuple, get_args
 
 import google.generativeai as genai
+import orjson
+from cachetools import LRUCache
+from google.ai import generativelanguage as glm
+from google.api_core.exceptions import ResourceExhausted
 
 from app.core.config import settings
 from app.schemas.chat_schema import (
@@ -10,9 +16,25 @@ from app.schemas.chat_schema import (
     Mistake,
     VocabSuggestion,
 )
-
-if settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+from app.utils.gemini_key_pool import GeminiKeyPool
+from app.utils.logger import get_logger
+from app.utils.semantic_cache import SemanticCache
+
+logger = get_logger(__name__)
+
+# All calls go through GenerativeModel.generate_content_async, which uses one
+# shared GenerativeServiceAsyncClient on the grpc_asyncio transport: a single
+# HTTP/2 channel multiplexes every request, so no per-call TLS handshake.
+# transport is deliberately not passed here: configure() applies it to sync
+# clients too, and a sync client on grpc_asyncio breaks.
+_GEMINI_API_KEYS = list(
+    dict.fromkeys(
+        settings.GEMINI_API_KEYS
+        or ([settings.GEMINI_API_KEY] if settings.GEMINI_API_KEY else [])
+    )
+)
+if settings.GEMINI_API_KEY or _GEMINI_API_KEYS:
+    genai.configure(api_key=settings.GEMINI_API_KEY or _GEMINI_API_KEYS[0])
 
 
 GEMINI_MODELS = [
@@ -28,45 +50,332 @@ DEFAULT_BOT_TEXT = "I'm having trouble responding right now. Please try again."
 DEFAULT_BOT_TRANSLATION = "Tôi đang gặp sự cố khi trả lời. Vui lòng thử lại sau."
 DEFAULT_GRAMMAR_ERROR = "No grammar feedback due to a model error."
 
+# Static parts of the chat system instruction; only the scenario context and
+# the target language are filled in per call.
+_CHAT_SYS_PREFIX = (
+    "You are a friendly English conversation partner for language learners. "
+)
+_CHAT_SYS_CONTEXT_TMPL = (
+    "\n\nIMPORTANT CONTEXT AND CONSTRAINTS:\n{system_context}\n\n"
+    "You MUST stay within the defined scenario and role. "
+    "If the learner tries to change the topic or scenario, "
+    "politely redirect them back to the current scenario. "
+    "For example: 'Let's focus on [current scenario] for now. How can I help you with that?'\n\n"
+)
+_CHAT_SYS_SUFFIX_TMPL = (
+    "Continue the conversation naturally in English based on the dialogue above. "
+    "After generating the reply in English, also provide a translation of your reply "
+    "into the target language (language code: {target_lang}). "
+    "Return a strict JSON object only, no extra text, in this exact format: "
+    '{{"bot_text": string, "bot_translation": string}}.'
+)
 
-def _clean_json_text(raw_text: str) -> str:
-    cleaned = (raw_text or "{}").strip()
-    if cleaned.startswith("```"):
-        lines = cleaned.splitlines()
-        lines = lines[1:]
-        if lines and lines[-1].strip().startswith("```"):
-            lines = lines[:-1]
-        cleaned = "\n".join(lines).strip()
+_GRAMMAR_SYSTEM_INSTRUCTION = (
+    "You are an English speaking and grammar coach. "
+    "The student sentence comes from SPOKEN English, not written text. "
+    "Evaluate only errors that would be clear when listening to speech: grammar (tense, word order, missing auxiliaries), "
+    "word choice, and naturalness for oral communication. "
+    "Do NOT penalize or mention purely written punctuation issues such as commas, question marks, or capitalization "
+    "if the sentence is otherwise clear and natural when spoken. "
+    "Also translate the student's sentence into the target language. "
+    "Additionally, provide vocabulary suggestions to help the student diversify their word choices, "
+    "and analyze any grammar structures they used (correctly or incorrectly). "
+    "Return a strict JSON object only, no extra text, in this exact format: "
+    '{"grammar_score": number (0-100), '
+    '"overall_feedback": string, '
+    '"mistakes": ['
+    '{"original": string, "correction": string, "type": "grammar"|"vocabulary"|"pronunciation", "explanation": string}'
+    "], "
+    '"user_translation": string, '
+    '"vocab_suggestions": ['
+    '{"word": string (the word/phrase student used), "context": string (how they used it), "alternatives": [string] (better/diverse alternatives)}'
+    "], "
+    '"grammar_breakdown": ['
+    '{"structure": string (grammar structure name like "Present Perfect", "Conditional"), "example": string (student sentence using this structure), "advice": string (improvement advice), "status": "Correct"|"Needs Improvement"}'
+    "]"
+    "}. "
+    "For vocab_suggestions: identify common or repetitive words the student used and suggest better alternatives. "
+    "For grammar_breakdown: identify 1-3 main grammar structures the student attempted and evaluate them."
+)
 
-    json_start = cleaned.find("{")
-    json_end = cleaned.rfind("}")
-    if json_start != -1 and json_end != -1 and json_end > json_start:
-        cleaned = cleaned[json_start : json_end + 1]
+# Gemini returns raw JSON matching these schemas (no markdown fences). The JSON
+# shape is still spelled out in the prompts for the DeepSeek fallback.
+_CHAT_REPLY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "bot_text": {"type": "string"},
+        "bot_translation": {"type": "string"},
+    },
+    # Gemini emits schema properties in alphabetical order, so bot_text comes
+    # before bot_translation, which stream_gemini_response relies on.
+    "required": ["bot_text", "bot_translation"],
+}
+
+_GRAMMAR_FEEDBACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "grammar_score": {"type": "number"},
+        "overall_feedback": {"type": "string"},
+        "mistakes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "original": {"type": "string"},
+                    "correction": {"type": "string"},
+                    "type": {
+                        "type": "string",
+                        "enum": ["grammar", "vocabulary", "pronunciation"],
+                    },
+                    "explanation": {"type": "string"},
+                },
+                "required": ["original", "correction", "type", "explanation"],
+            },
+        },
+        "user_translation": {"type": "string"},
+        "vocab_suggestions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "word": {"type": "string"},
+                    "context": {"type": "string"},
+                    "alternatives": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["word", "context", "alternatives"],
+            },
+        },
+        "grammar_breakdown": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "structure": {"type": "string"},
+                    "example": {"type": "string"},
+                    "advice": {"type": "string"},
+                    "status": {
+                        "type": "string",
+                        "enum": ["Correct", "Needs Improvement"],
+                    },
+                },
+                "required": ["structure", "example", "advice", "status"],
+            },
+        },
+    },
+    "required": [
+        "grammar_score",
+        "overall_feedback",
+        "mistakes",
+        "user_translation",
+        "vocab_suggestions",
+        "grammar_breakdown",
+    ],
+}
+
+_CHAT_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json", response_schema=_CHAT_REPLY_SCHEMA
+)
+_GRAMMAR_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json", response_schema=_GRAMMAR_FEEDBACK_SCHEMA
+)
+
+_key_pool = GeminiKeyPool(
+    _GEMINI_API_KEYS,
+    max_concurrency_per_key=settings.GEMINI_MAX_CONCURRENCY,
+    cooldown_seconds=settings.GEMINI_KEY_COOLDOWN_SECONDS,
+    requests_per_minute=settings.GEMINI_KEY_RPM,
+)
 
-    return cleaned
+# Exact prompt -> reply, for retries and reopened scenarios. Only touched from
+# the event loop, so it needs no lock.
+_prompt_reply_cache: LRUCache = LRUCache(maxsize=settings.PROMPT_CACHE_MAX_ENTRIES)
+_prompt_cache_stats = {"hits": 0, "misses": 0}
+
+_semantic_reply_cache = (
+    SemanticCache(
+        model_name=settings.EMBEDDING_MODEL,
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+    )
+    if settings.SEMANTIC_CACHE_ENABLED
+    else None
+)
 
 
 def _parse_json_object(raw_text: str) -> dict[str, Any]:
-    data = json.loads(_clean_json_text(raw_text))
+    data = orjson.loads(raw_text or "{}")
     if not isinstance(data, dict):
         raise ValueError("LLM response must be a JSON object.")
     return data
 
 
-def _generate_deepseek_json(prompt: str, caller: str, max_tokens: int) -> dict[str, Any]:
-    if not settings.DEEPSEEK_API_KEY:
-        raise RuntimeError("Missing DEEPSEEK_API_KEY.")
+@functools.lru_cache(maxsize=None)
+def _async_client_for_key(api_key: str) -> glm.GenerativeServiceAsyncClient:
+    return glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
 
-    try:
-        from openai import OpenAI
-    except Exception as import_error:
-        raise RuntimeError("Python package 'openai' is not installed.") from import_error
 
-    client = OpenAI(
-        api_key=settings.DEEPSEEK_API_KEY,
-        base_url=settings.DEEPSEEK_BASE_URL or "https://api.deepseek.com",
+# The per-key binding below relies on a private attribute of this SDK line.
+_BIND_TESTED_SDK = "0.8."
+if len(_key_pool.keys) > 1 and not genai.__version__.startswith(_BIND_TESTED_SDK):
+    logger.warning(
+        "google-generativeai %s is untested with GEMINI_API_KEYS (tested: %sx)",
+        genai.__version__,
+        _BIND_TESTED_SDK,
     )
-    response = client.chat.completions.create(
+
+
+def _bind_api_key(model: genai.GenerativeModel, api_key: str) -> None:
+    """Send ``model``'s async calls with ``api_key`` instead of the configured one.
+
+    GenerativeModel takes no client options, and falls back to the default
+    client only while its private ``_async_client`` is unset, so that is the
+    one place the SDK is reached into.
+    """
+    if not hasattr(model, "_async_client"):
+        raise RuntimeError(
+            f"google-generativeai {genai.__version__} has no "
+            "GenerativeModel._async_client; GEMINI_API_KEYS needs 0.8.x"
+        )
+    model._async_client = _async_client_for_key(api_key)
+
+
+@functools.lru_cache(maxsize=len(GEMINI_MODELS) * len(_key_pool.keys))
+def _get_model(
+    model_name: str, api_key: Optional[str] = None
+) -> genai.GenerativeModel:
+    # GenerativeModel holds no per-request state; build each one once per key.
+    model = genai.GenerativeModel(model_name)
+    # A single key is the one passed to genai.configure(): keep the SDK path.
+    if api_key and len(_key_pool.keys) > 1:
+        _bind_api_key(model, api_key)
+    return model
+
+
+async def warmup() -> None:
+    """Build every model/key client and load the embedding model up front.
+
+    Run from the startup hook (on the event loop, which the async clients bind
+    to). No request is sent, so startup costs no quota; the gRPC channel itself
+    connects on the first call.
+    """
+    for api_key in _key_pool.keys:
+        for model_name in GEMINI_MODELS:
+            _get_model(model_name, api_key)
+    if _semantic_reply_cache is not None:
+        await asyncio.to_thread(_semantic_reply_cache.embed, "warmup")
+
+
+async def _call_gemini(
+    model_name: str, prompt: str, generation_config: genai.GenerationConfig
+) -> Any:
+    """generate_content_async on the least-loaded key, moving on to the next
+    key when one is rate limited. Raises once every key has returned a 429."""
+    tried: tuple = ()
+    while True:
+        async with _key_pool.slot(exclude=tried) as api_key:
+            try:
+                return await _get_model(model_name, api_key).generate_content_async(
+                    prompt, generation_config=generation_config
+                )
+            except ResourceExhausted:
+                _key_pool.cool_down(api_key)
+                tried += (api_key,)
+                if not _key_pool.has_ready_key(exclude=tried):
+                    raise
+
+
+async def _generate_with_fallback(
+    prompt: str, caller: str, generation_config: genai.GenerationConfig
+) -> str:
+    """Return the raw text of the first Gemini model that answers.
+
+    The first GEMINI_PARALLEL_MODELS models are raced and the losers are
+    cancelled, so a slow or failing model no longer adds its full latency
+    before the next one is tried. The remaining models are then tried one by
+    one. Raises the last error if every model fails.
+    """
+
+    async def _call(model_name: str) -> str:
+        response = await _call_gemini(model_name, prompt, generation_config)
+        return response.text or "{}"
+
+    width = max(1, settings.GEMINI_PARALLEL_MODELS)
+    last_error: Exception = RuntimeError("No Gemini models configured.")
+
+    pending = {asyncio.create_task(_call(m)): m for m in GEMINI_MODELS[:width]}
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending.keys(), return_when=asyncio.FIRST_COMPLETED
+            )
+            # Retrieve every finished task's outcome before returning, so a
+            # failure that finished alongside the winner is still observed
+            # (otherwise asyncio logs "Task exception was never retrieved").
+            result: Optional[str] = None
+            for task in sorted(done, key=lambda t: GEMINI_MODELS.index(pending[t])):
+                model_name = pending.pop(task)
+                error = task.exception()
+                if error is not None:
+                    logger.warning(
+                        "[%s] Error with model %s: %s", caller, model_name, error
+                    )
+                    last_error = error
+                elif result is None:
+                    result = task.result()
+            if result is not None:
+                return result
+    finally:
+        for task in pending:
+            task.cancel()
+
+    for model_name in GEMINI_MODELS[width:]:
+        try:
+            return await _call(model_name)
+        except Exception as e:
+            logger.warning("[%s] Error with model %s: %s", caller, model_name, e)
+            last_error = e
+
+    raise last_error
+
+
+# One AsyncOpenAI (and its connection pool) for the process: built on the
+# first fallback, closed by aclose() at shutdown.
+_deepseek_client: Optional[Any] = None
+
+
+def _get_deepseek_client() -> Any:
+    global _deepseek_client
+    if _deepseek_client is None:
+        if not settings.DEEPSEEK_API_KEY:
+            raise RuntimeError("Missing DEEPSEEK_API_KEY.")
+
+        try:
+            from openai import AsyncOpenAI
+        except Exception as import_error:
+            raise RuntimeError(
+                "Python package 'openai' is not installed."
+            ) from import_error
+
+        _deepseek_client = AsyncOpenAI(
+            api_key=settings.DEEPSEEK_API_KEY,
+            base_url=settings.DEEPSEEK_BASE_URL or "https://api.deepseek.com",
+        )
+    return _deepseek_client
+
+
+async def aclose() -> None:
+    """Close the DeepSeek client's connections; run from the shutdown hook."""
+    global _deepseek_client
+    client, _deepseek_client = _deepseek_client, None
+    if client is not None:
+        await client.close()
+
+
+async def _generate_deepseek_json(
+    prompt: str, caller: str, max_tokens: int
+) -> dict[str, Any]:
+    response = await _get_deepseek_client().chat.completions.create(
         model=settings.DEEPSEEK_MODEL or "deepseek-v4-flash",
         messages=[
             {
@@ -83,10 +392,15 @@ def _generate_deepseek_json(prompt: str, caller: str, max_tokens: int) -> dict[s
         max_tokens=max_tokens,
     )
     raw_text = response.choices[0].message.content or "{}"
-    print(f"[{caller}] DeepSeek succeeded with model {settings.DEEPSEEK_MODEL}.")
+    logger.info(
+        "[%s] DeepSeek succeeded with model %s.", caller, settings.DEEPSEEK_MODEL
+    )
     return _parse_json_object(raw_text)
 
 
+_MISTAKE_TYPES = frozenset(get_args(Mistake.model_fields["type"].annotation))
+
+
 def _conversation_reply_from_data(data: dict[str, Any]) -> Tuple[str, str]:
     bot_text = str(data.get("bot_text", "")).strip()
     bot_translation = str(data.get("bot_translation", "")).strip()
@@ -106,15 +420,21 @@ def _grammar_feedback_from_data(
     overall_feedback = str(data.get("overall_feedback", ""))
     user_translation = str(data.get("user_translation", ""))
 
+    # Every field is coerced to str below, so the items are built with
+    # model_construct() instead of a second validation pass. The Literal fields
+    # are the only ones pydantic would reject, so they are checked here.
     mistakes_raw = data.get("mistakes", []) or []
     mistakes: List[Mistake] = []
     for m in mistakes_raw:
         try:
+            mistake_type = str(m.get("type", "grammar"))
+            if mistake_type not in _MISTAKE_TYPES:
+                continue
             mistakes.append(
-                Mistake(
+                Mistake.model_construct(
                     original=str(m.get("original", "")),
                     correction=str(m.get("correction", "")),
-                    type=str(m.get("type", "grammar")),
+                    type=mistake_type,
                     explanation=str(m.get("explanation", "")),
                 )
             )
@@ -129,7 +449,7 @@ def _grammar_feedback_from_data(
             if not isinstance(alternatives, list):
                 alternatives = [str(alternatives)]
             vocab_suggestions.append(
-                VocabSuggestion(
+                VocabSuggestion.model_construct(
                     word=str(v.get("word", "")),
                     context=str(v.get("context", "")),
                     alternatives=[str(item) for item in alternatives],
@@ -146,7 +466,7 @@ def _grammar_feedback_from_data(
             if status not in ["Correct", "Needs Improvement"]:
                 status = "Needs Improvement"
             grammar_breakdown.append(
-                GrammarBreakdownItem(
+                GrammarBreakdownItem.model_construct(
                     structure=str(g.get("structure", "")),
                     example=str(g.get("example", "")),
                     advice=str(g.get("advice", "")),
@@ -180,14 +500,25 @@ def build_prompt_from_messages(messages: List[ChatMessage]) -> str:
     return "\n".join(lines) + "\nAssistant:"
 
 
-def generate_gemini_response(
-    messages: List[ChatMessage], target_lang: str = "vi"
-) -> Tuple[str, str]:
-    """Generate a conversational bot reply and its translation.
+def _semantic_cache_text(
+    system_context: str, conversation_messages: List[ChatMessage], target_lang: str
+) -> str:
+    # The previous assistant turn is part of the key so that e.g. a greeting
+    # mid-dialogue does not match the reply to the opening greeting.
+    last_bot = ""
+    for msg in reversed(conversation_messages[:-1]):
+        if msg.role == "assistant":
+            last_bot = msg.content
+            break
+    return "\n".join(
+        [f"[{target_lang}] {system_context}", last_bot, conversation_messages[-1].content]
+    )
 
-    Returns (bot_text_en, bot_translation_target_lang).
-    """
 
+def _conversation_prompt(
+    messages: List[ChatMessage], target_lang: str
+) -> Tuple[str, str, List[ChatMessage]]:
+    """Return (prompt, system_context, conversation_messages) for a chat reply."""
     system_context = ""
     conversation_messages = messages
     if messages and messages[0].role == "system":
@@ -196,73 +527,202 @@ def generate_gemini_response(
 
     conversation_prompt = build_prompt_from_messages(conversation_messages)
 
-    system_instruction = (
-        "You are a friendly English conversation partner for language learners. "
-    )
-
+    system_instruction = _CHAT_SYS_PREFIX
     if system_context:
-        system_instruction += (
-            f"\n\nIMPORTANT CONTEXT AND CONSTRAINTS:\n{system_context}\n\n"
-            "You MUST stay within the defined scenario and role. "
-            "If the learner tries to change the topic or scenario, "
-            "politely redirect them back to the current scenario. "
-            "For example: 'Let's focus on [current scenario] for now. How can I help you with that?'\n\n"
+        system_instruction += _CHAT_SYS_CONTEXT_TMPL.format(
+            system_context=system_context
         )
-
-    system_instruction += (
-        "Continue the conversation naturally in English based on the dialogue above. "
-        "After generating the reply in English, also provide a translation of your reply "
-        f"into the target language (language code: {target_lang}). "
-        "Return a strict JSON object only, no extra text, in this exact format: "
-        '{"bot_text": string, "bot_translation": string}. '
-        "Do NOT use markdown or code fences. Respond with a plain JSON object only."
-    )
+    system_instruction += _CHAT_SYS_SUFFIX_TMPL.format(target_lang=target_lang)
 
     prompt = system_instruction + "\n\nConversation so far:\n" + conversation_prompt
+    return prompt, system_context, conversation_messages
 
-    last_error: Exception | None = None
-    raw_text = "{}"
-    for model_name in GEMINI_MODELS:
+
+async def generate_gemini_response(
+    messages: List[ChatMessage], target_lang: str = "vi"
+) -> Tuple[str, str]:
+    """Generate a conversational bot reply and its translation.
+
+    Returns (bot_text_en, bot_translation_target_lang).
+    """
+
+    prompt, system_context, conversation_messages = _conversation_prompt(
+        messages, target_lang
+    )
+
+    cached = _prompt_reply_cache.get(prompt)
+    if cached is not None:
+        _prompt_cache_stats["hits"] += 1
+        logger.debug("prompt cache hit (stats=%s)", _prompt_cache_stats)
+        return cached
+    _prompt_cache_stats["misses"] += 1
+    logger.debug("prompt cache miss (stats=%s)", _prompt_cache_stats)
+
+    # Near-duplicate learner turns in the same scenario reuse a previous reply.
+    cache_vector = None
+    if _semantic_reply_cache is not None and conversation_messages:
         try:
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content(prompt)
-            raw_text = response.text or "{}"
-            break
+            cache_vector = await asyncio.to_thread(
+                _semantic_reply_cache.embed,
+                _semantic_cache_text(system_context, conversation_messages, target_lang),
+            )
+            cached = _semantic_reply_cache.lookup(cache_vector)
+            if cached is not None:
+                return cached
         except Exception as e:
-            print(f"[generate_gemini_response] Error with model {model_name}:", e)
-            last_error = e
+            logger.warning("[generate_gemini_response] Semantic cache error: %s", e)
+
+    reply = await _generate_conversation_reply(prompt)
+    if reply[0] != DEFAULT_BOT_TEXT:
+        _prompt_reply_cache[prompt] = reply
+        if cache_vector is not None:
+            _semantic_reply_cache.add(cache_vector, reply)
+    return reply
 
-    if last_error and raw_text == "{}":
-        print("[generate_gemini_response] All Gemini models failed.", last_error)
+
+async def _generate_conversation_reply(prompt: str) -> Tuple[str, str]:
+    try:
+        raw_text = await _generate_with_fallback(
+            prompt,
+            caller="generate_gemini_response",
+            generation_config=_CHAT_GENERATION_CONFIG,
+        )
+    except Exception as gemini_error:
+        logger.warning(
+            "[generate_gemini_response] All Gemini models failed: %s", gemini_error
+        )
         try:
-            data = _generate_deepseek_json(
+            data = await _generate_deepseek_json(
                 prompt,
                 caller="generate_gemini_response",
                 max_tokens=1200,
             )
             return _conversation_reply_from_data(data)
         except Exception as deepseek_error:
-            print("[generate_gemini_response] DeepSeek fallback failed.", deepseek_error)
+            logger.error(
+                "[generate_gemini_response] DeepSeek fallback failed: %s",
+                deepseek_error,
+            )
             return DEFAULT_BOT_TEXT, DEFAULT_BOT_TRANSLATION
 
     try:
         data = _parse_json_object(raw_text)
         return _conversation_reply_from_data(data)
     except Exception as parse_error:
-        print("[generate_gemini_response] JSON parse error:", parse_error)
-        print("[generate_gemini_response] raw response:", raw_text)
+        logger.warning(
+            "[generate_gemini_response] JSON parse error: %s; raw response: %s",
+            parse_error,
+            raw_text,
+        )
         try:
-            data = _generate_deepseek_json(
+            data = await _generate_deepseek_json(
                 prompt,
                 caller="generate_gemini_response",
                 max_tokens=1200,
             )
             return _conversation_reply_from_data(data)
         except Exception as deepseek_error:
-            print("[generate_gemini_response] DeepSeek fallback failed.", deepseek_error)
+            logger.error(
+                "[generate_gemini_response] DeepSeek fallback failed: %s",
+                deepseek_error,
+            )
             return DEFAULT_BOT_TEXT, DEFAULT_BOT_TRANSLATION
 
-def grammar_feedback_from_gemini(
+
+def _json_string_field(raw_text: str, key: str) -> Optional[str]:
+    """Value of a top-level string field once its closing quote has arrived."""
+    match = re.search(r'"%s"\s*:\s*("(?:[^"\\]|\\.)*")' % re.escape(key), raw_text)
+    if match is None:
+        return None
+    return orjson.loads(match.group(1))
+
+
+def _chunk_text(chunk: Any) -> str:
+    try:
+        return chunk.text or ""
+    except ValueError:
+        # Chunks without text parts (e.g. the final finish_reason chunk)
+        return ""
+
+
+async def stream_gemini_response(
+    messages: List[ChatMessage], target_lang: str = "vi"
+) -> AsyncIterator[Tuple[str, str]]:
+    """Streaming variant of generate_gemini_response.
+
+    Yields ("bot_text", text) as soon as that field is complete in the model
+    output, then ("bot_translation", translation). Models are tried in order
+    until one starts answering; if none does, falls back to DeepSeek.
+    """
+    prompt, _, _ = _conversation_prompt(messages, target_lang)
+
+    cached = _prompt_reply_cache.get(prompt)
+    if cached is not None:
+        _prompt_cache_stats["hits"] += 1
+        yield "bot_text", cached[0]
+        yield "bot_translation", cached[1]
+        return
+    _prompt_cache_stats["misses"] += 1
+
+    bot_text: Optional[str] = None
+    for model_name in GEMINI_MODELS:
+        raw_text = ""
+        try:
+            async with _key_pool.slot() as api_key:
+                model = _get_model(model_name, api_key)
+                try:
+                    response = await model.generate_content_async(
+                        prompt, generation_config=_CHAT_GENERATION_CONFIG, stream=True
+                    )
+                except ResourceExhausted:
+                    # The next model is tried with the next key in rotation.
+                    _key_pool.cool_down(api_key)
+                    raise
+                async for chunk in response:
+                    raw_text += _chunk_text(chunk)
+                    if bot_text is None:
+                        bot_text = _json_string_field(raw_text, "bot_text")
+                        if bot_text is not None:
+                            bot_text = bot_text.strip() or DEFAULT_BOT_TEXT
+                            yield "bot_text", bot_text
+            reply = _conversation_reply_from_data(_parse_json_object(raw_text))
+        except Exception as e:
+            logger.warning(
+                "[stream_gemini_response] Error with model %s: %s", model_name, e
+            )
+            if bot_text is None:
+                continue
+            # bot_text is already out; salvage the translation if it arrived.
+            translation = _json_string_field(raw_text, "bot_translation")
+            translation = (translation or "").strip() or DEFAULT_BOT_TRANSLATION
+            yield "bot_translation", translation
+            return
+
+        if bot_text is None:
+            yield "bot_text", reply[0]
+        yield "bot_translation", reply[1]
+        if reply[0] != DEFAULT_BOT_TEXT:
+            _prompt_reply_cache[prompt] = reply
+        return
+
+    logger.warning("[stream_gemini_response] All Gemini models failed.")
+    try:
+        data = await _generate_deepseek_json(
+            prompt,
+            caller="stream_gemini_response",
+            max_tokens=1200,
+        )
+        reply = _conversation_reply_from_data(data)
+    except Exception as deepseek_error:
+        logger.error(
+            "[stream_gemini_response] DeepSeek fallback failed: %s", deepseek_error
+        )
+        reply = DEFAULT_BOT_TEXT, DEFAULT_BOT_TRANSLATION
+    yield "bot_text", reply[0]
+    yield "bot_translation", reply[1]
+
+
+async def grammar_feedback_from_gemini(
     transcript: str,
     source_lang: str = "en",
     target_lang: str = "vi",
@@ -280,37 +740,8 @@ def grammar_feedback_from_gemini(
     if not transcript.strip():
         return 0.0, "No transcript provided for grammar evaluation.", [], "", [], []
 
-    system_instruction = (
-        "You are an English speaking and grammar coach. "
-        "The student sentence comes from SPOKEN English, not written text. "
-        "Evaluate only errors that would be clear when listening to speech: grammar (tense, word order, missing auxiliaries), "
-        "word choice, and naturalness for oral communication. "
-        "Do NOT penalize or mention purely written punctuation issues such as commas, question marks, or capitalization "
-        "if the sentence is otherwise clear and natural when spoken. "
-        "Also translate the student's sentence into the target language. "
-        "Additionally, provide vocabulary suggestions to help the student diversify their word choices, "
-        "and analyze any grammar structures they used (correctly or incorrectly). "
-        "Return a strict JSON object only, no extra text, in this exact format: "
-        '{"grammar_score": number (0-100), '
-        '"overall_feedback": string, '
-        '"mistakes": ['
-        '{"original": string, "correction": string, "type": "grammar"|"vocabulary"|"pronunciation", "explanation": string}'
-        "], "
-        '"user_translation": string, '
-        '"vocab_suggestions": ['
-        '{"word": string (the word/phrase student used), "context": string (how they used it), "alternatives": [string] (better/diverse alternatives)}'
-        "], "
-        '"grammar_breakdown": ['
-        '{"structure": string (grammar structure name like "Present Perfect", "Conditional"), "example": string (student sentence using this structure), "advice": string (improvement advice), "status": "Correct"|"Needs Improvement"}'
-        "]"
-        "}. "
-        "For vocab_suggestions: identify common or repetitive words the student used and suggest better alternatives. "
-        "For grammar_breakdown: identify 1-3 main grammar structures the student attempted and evaluate them. "
-        "Do NOT use markdown or code fences. Respond with a plain JSON object only."
-    )
-
     prompt = (
-        system_instruction
+        _GRAMMAR_SYSTEM_INSTRUCTION
         + "\n\nStudent sentence: "
         + transcript
         + f"\nSource language code: {source_lang}"
@@ -319,33 +750,27 @@ def grammar_feedback_from_gemini(
     )
 
     try:
-        raw_text = "{}"
-        last_error: Exception | None = None
-        for model_name in GEMINI_MODELS:
-            try:
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                raw_text = response.text or "{}"
-                break
-            except Exception as e:
-                print(
-                    f"[grammar_feedback_from_gemini] Error with model {model_name}:",
-                    e,
-                )
-                last_error = e
-
-        if last_error and raw_text == "{}":
-            print("[grammar_feedback_from_gemini] All Gemini models failed.", last_error)
+        try:
+            raw_text = await _generate_with_fallback(
+                prompt,
+                caller="grammar_feedback_from_gemini",
+                generation_config=_GRAMMAR_GENERATION_CONFIG,
+            )
+        except Exception as gemini_error:
+            logger.warning(
+                "[grammar_feedback_from_gemini] All Gemini models failed: %s",
+                gemini_error,
+            )
             try:
-                data = _generate_deepseek_json(
+                data = await _generate_deepseek_json(
                     prompt,
                     caller="grammar_feedback_from_gemini",
                     max_tokens=2400,
                 )
                 return _grammar_feedback_from_data(data)
             except Exception as deepseek_error:
-                print(
-                    "[grammar_feedback_from_gemini] DeepSeek fallback failed.",
+                logger.error(
+                    "[grammar_feedback_from_gemini] DeepSeek fallback failed: %s",
                     deepseek_error,
                 )
                 return 0.0, DEFAULT_GRAMMAR_ERROR, [], "", [], []
@@ -353,18 +778,21 @@ def grammar_feedback_from_gemini(
         try:
             data = _parse_json_object(raw_text)
         except Exception as parse_error:
-            print("[grammar_feedback_from_gemini] JSON parse error:", parse_error)
-            print("[grammar_feedback_from_gemini] raw response:", raw_text)
+            logger.warning(
+                "[grammar_feedback_from_gemini] JSON parse error: %s; raw response: %s",
+                parse_error,
+                raw_text,
+            )
             try:
-                data = _generate_deepseek_json(
+                data = await _generate_deepseek_json(
                     prompt,
                     caller="grammar_feedback_from_gemini",
                     max_tokens=2400,
                 )
                 return _grammar_feedback_from_data(data)
             except Exception as deepseek_error:
-                print(
-                    "[grammar_feedback_from_gemini] DeepSeek fallback failed.",
+                logger.error(
+                    "[grammar_feedback_from_gemini] DeepSeek fallback failed: %s",
                     deepseek_error,
                 )
                 return (
@@ -378,5 +806,36 @@ def grammar_feedback_from_gemini(
 
         return _grammar_feedback_from_data(data)
     except Exception as e:
-        print("[grammar_feedback_from_gemini] LLM call error:", e)
+        logger.error("[grammar_feedback_from_gemini] LLM call error: %s", e)
         return 0.0, DEFAULT_GRAMMAR_ERROR, [], "", [], []
+
+
+async def grammar_feedback_batch(
+    transcripts: List[str],
+    source_lang: str = "en",
+    target_lang: str = "vi",
+) -> List[
+    Tuple[
+        float,
+        str,
+        List[Mistake],
+        str,
+        List[VocabSuggestion],
+        List[GrammarBreakdownItem],
+    ]
+]:
+    """Grade many transcripts (lesson review, bulk re-scoring) concurrently.
+
+    Results are in input order and have the same shape as
+    grammar_feedback_from_gemini. At most GRAMMAR_BATCH_CONCURRENCY requests
+    are in flight so a large batch does not trip the provider's rate limits.
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.GRAMMAR_BATCH_CONCURRENCY))
+
+    async def _grade(transcript: str):
+        async with semaphore:
+            return await grammar_feedback_from_gemini(
+                transcript, source_lang=source_lang, target_lang=target_lang
+            )
+
+    return list(await asyncio.gather(*(_grade(t) for t in transcripts)))
@@ -0,0 +1,108 @@
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+
+class GeminiKeyPool:
+    """Spread Gemini requests over several API keys.
+
+    Each key has its own in-flight cap and, with ``requests_per_minute`` set,
+    its own token bucket (burst of ``requests_per_minute``, refilled evenly
+    over the minute). A request takes the least-loaded key that is not
+    cooling down after a 429, preferring keys with a token left; if every key
+    is cooling down, the one that recovers first is used. With no keys
+    configured, requests get ``None`` (use the default genai client) under a
+    single cap.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        max_concurrency_per_key: int = 16,
+        cooldown_seconds: float = 30,
+        requests_per_minute: int = 0,
+    ) -> None:
+        self.keys: List[Optional[str]] = list(dict.fromkeys(keys)) or [None]
+        self.max_concurrency_per_key = max(1, max_concurrency_per_key)
+        self.cooldown_seconds = cooldown_seconds
+        self.requests_per_minute = max(0, requests_per_minute)  # 0: no limit
+
+        # Semaphores are created lazily so they bind to the running loop
+        # (Python 3.9 binds asyncio primitives at construction time).
+        self._semaphores: Dict[Optional[str], asyncio.Semaphore] = {}
+        self._in_flight: Dict[Optional[str], int] = dict.fromkeys(self.keys, 0)
+        self._cooldown_until: Dict[Optional[str], float] = dict.fromkeys(
+            self.keys, 0.0
+        )
+        self._tokens: Dict[Optional[str], float] = dict.fromkeys(
+            self.keys, float(self.requests_per_minute)
+        )
+        self._refilled_at: Dict[Optional[str], float] = dict.fromkeys(
+            self.keys, time.monotonic()
+        )
+
+    def _semaphore(self, key: Optional[str]) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_key)
+            self._semaphores[key] = semaphore
+        return semaphore
+
+    def _available_tokens(self, key: Optional[str], now: float) -> float:
+        rate = self.requests_per_minute / 60
+        return min(
+            float(self.requests_per_minute),
+            self._tokens[key] + (now - self._refilled_at[key]) * rate,
+        )
+
+    def _reserve(self, key: Optional[str]) -> float:
+        """Take one request token from the key, returning the wait until it is due."""
+        if not self.requests_per_minute:
+            return 0.0
+        now = time.monotonic()
+        tokens = self._available_tokens(key, now)
+        # The balance may go negative: later callers queue behind this one.
+        self._tokens[key] = tokens - 1
+        self._refilled_at[key] = now
+        return max(0.0, (1 - tokens) * 60 / self.requests_per_minute)
+
+    def _pick(self, exclude: tuple) -> Optional[str]:
+        candidates = [k for k in self.keys if k not in exclude] or self.keys
+        now = time.monotonic()
+        ready = [k for k in candidates if self._cooldown_until[k] <= now]
+        if ready:
+            if self.requests_per_minute:
+                return min(
+                    ready,
+                    key=lambda k: (
+                        self._available_tokens(k, now) < 1,
+                        self._in_flight[k],
+                    ),
+                )
+            return min(ready, key=self._in_flight.__getitem__)
+        return min(candidates, key=self._cooldown_until.__getitem__)
+
+    def has_ready_key(self, exclude: tuple = ()) -> bool:
+        now = time.monotonic()
+        return any(
+            self._cooldown_until[k] <= now for k in self.keys if k not in exclude
+        )
+
+    @contextlib.asynccontextmanager
+    async def slot(self, exclude: tuple = ()) -> AsyncIterator[Optional[str]]:
+        """Hold one in-flight slot on the best available key, yielding the key."""
+        key = self._pick(exclude)
+        self._in_flight[key] += 1
+        try:
+            delay = self._reserve(key)
+            if delay:
+                await asyncio.sleep(delay)
+            async with self._semaphore(key):
+                yield key
+        finally:
+            self._in_flight[key] -= 1
+
+    def cool_down(self, key: Optional[str]) -> None:
+        """Take the key out of rotation after it was rate limited (429)."""
+        self._cooldown_until[key] = time.monotonic() + self.cooldown_seconds
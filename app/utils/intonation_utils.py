@@ -1,29 +1,164 @@
-from typing import List, Tuple
+import hashlib
+import math
+import os
+import threading
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import parselmouth
+from cachetools import LRUCache
 from parselmouth.praat import call
 
+from app.utils.audio_utils import WavAudio, as_wav_audio
+
+# WAV file path, in-memory WAV bytes, or WAV audio the caller already parsed
+AudioInput = Union[str, bytes, WavAudio]
+
+# Pitch tracks keyed by audio identity, so scoring the same audio with several
+# functions runs Praat's pitch analysis once.
+_pitch_cache: LRUCache = LRUCache(maxsize=64)
+_pitch_cache_lock = threading.Lock()
+
+
+def _load_sound(audio: AudioInput) -> parselmouth.Sound:
+    """Load a Praat Sound from a file path or from in-memory WAV audio."""
+    if isinstance(audio, str):
+        return parselmouth.Sound(audio)
+    wav = as_wav_audio(audio)
+    return parselmouth.Sound(wav.to_float_samples(), sampling_frequency=wav.sample_rate)
+
+
+def _audio_key(audio: AudioInput) -> tuple:
+    if isinstance(audio, str):
+        st = os.stat(audio)
+        return ("path", audio, st.st_mtime, st.st_size)
+    if isinstance(audio, WavAudio):
+        return (
+            "pcm",
+            audio.sample_rate,
+            audio.sample_width,
+            audio.channels,
+            audio.is_float,
+            hashlib.blake2b(audio.frames, digest_size=16).digest(),
+        )
+    return ("wav", hashlib.blake2b(audio, digest_size=16).digest())
+
+
+# Below these, a recording carries no usable intonation (aborted or silent
+# upload), so Praat's pitch analysis is skipped.
+MIN_DURATION_S = 0.3
+SILENCE_STD = 1e-4
+
 
-def pitch_per_word(words: List[str], audio_path: str) -> tuple[list[str], float]:
+def _get_pitch(audio: AudioInput) -> Optional[parselmouth.Pitch]:
+    """Praat pitch track (autocorrelation, 75-600 Hz) for the audio, memoized.
+
+    Returns None when the audio is too short or silent to analyse.
+    """
+    key = _audio_key(audio)
+    with _pitch_cache_lock:
+        if key in _pitch_cache:
+            return _pitch_cache[key]
+
+    sound = _load_sound(audio)
+    pitch = None
+    if (
+        sound.get_total_duration() >= MIN_DURATION_S
+        and sound.values.std() >= SILENCE_STD
+    ):
+        # Same analysis as Praat's "To Pitch" with (0.0, 75, 600).
+        pitch = sound.to_pitch(pitch_floor=75.0, pitch_ceiling=600.0)
+    with _pitch_cache_lock:
+        _pitch_cache[key] = pitch
+    return pitch
+
+
+def warmup() -> None:
+    """Run one pitch analysis so Praat's one-time setup happens at startup."""
+    parselmouth.Sound(np.zeros(16000), sampling_frequency=16000).to_pitch(
+        pitch_floor=75.0, pitch_ceiling=600.0
+    )
+
+
+def pitch_per_word(words: List[str], audio: AudioInput) -> tuple[list[str], float]:
     """Compute simple pitch per word and overall average, similar to intonation.pitch."""
-    per_word_pitch: list[str] = []
-    sound = parselmouth.Sound(audio_path)
-    pitch_obj = sound.to_pitch()
+    pitch_obj = _get_pitch(audio)
+    if pitch_obj is None:
+        return [f"{w}: 0 Hz" for w in words], 0.0
     values = pitch_obj.selected_array["frequency"]
-    non_zero = [x for x in values if x != 0]
+    non_zero = values[values != 0]  # voiced frames only
 
-    for i, w in enumerate(words):
-        if i < len(non_zero):
-            per_word_pitch.append(f"{w}: {non_zero[i]} Hz")
-        else:
-            per_word_pitch.append(f"{w}: 0 Hz")
+    # Word i gets the i-th voiced frame; words past the last voiced frame get 0 Hz.
+    voiced = non_zero[: len(words)].tolist()
+    per_word_pitch = [f"{w}: {hz} Hz" for w, hz in zip(words, voiced)]
+    per_word_pitch += [f"{w}: 0 Hz" for w in words[len(voiced) :]]
 
-    overall = float(np.mean(non_zero)) if non_zero else 0.0
+    overall = float(non_zero.mean()) if non_zero.size else 0.0
     return per_word_pitch, overall
 
 
-def calculate_intonation_score(audio_path: str) -> float:
+# Native English speaker reference values (from research)
+NATIVE_MEAN_F0 = 130.0  # Hz
+NATIVE_RANGE_F0 = 70.0  # Hz (max - min)
+NATIVE_STD_F0 = 30.0  # Hz
+
+
+def _pitch_percentages(audio: AudioInput) -> Optional[Tuple[float, float]]:
+    """Pitch range and std of the audio as percentages of the native reference,
+    or None for audio too short or silent to analyse."""
+    pitch = _get_pitch(audio)
+    if pitch is None:
+        return None
+    min_f0 = call(pitch, "Get minimum", 0, 0, "Hertz", "Parabolic")
+    max_f0 = call(pitch, "Get maximum", 0, 0, "Hertz", "Parabolic")
+    std_f0 = call(pitch, "Get standard deviation", 0, 0, "Hertz")
+    # Praat reports these as undefined (NaN) when too few frames are voiced,
+    # e.g. a recording of the mic noise floor: treat that as silence.
+    if math.isnan(min_f0) or math.isnan(max_f0) or math.isnan(std_f0):
+        return None
+    return (
+        (max_f0 - min_f0) / NATIVE_RANGE_F0 * 100,
+        std_f0 / NATIVE_STD_F0 * 100,
+    )
+
+
+def _score_from_percent_vec(
+    percents: np.ndarray, ideal_min: float = 80, ideal_max: float = 120
+) -> np.ndarray:
+    """
+    Convert percentages to scores with penalties for being outside ideal range.
+
+    Args:
+        percents: Percentage values to convert (any shape)
+        ideal_min: Minimum ideal percentage (default 80)
+        ideal_max: Maximum ideal percentage (default 120)
+
+    Returns:
+        Scores from 0 to 100, same shape as percents
+    """
+    percents = np.asarray(percents, dtype=np.float64)
+    # Too flat: linear penalty
+    too_flat = np.maximum(0.0, 100 * (percents / ideal_min))
+    # Too varied: gentle penalty, max 50 points. Percentages are never NaN
+    # here: _pitch_percentages returns None for undefined pitch statistics.
+    too_varied = np.maximum(0.0, 100 - np.fmin(50.0, (percents - ideal_max) / 2))
+    return np.where(
+        percents < ideal_min,
+        too_flat,
+        np.where(percents <= ideal_max, 100.0, too_varied),
+    )
+
+
+def _intonation_from_percents(
+    range_percents: np.ndarray, std_percents: np.ndarray
+) -> np.ndarray:
+    range_scores = _score_from_percent_vec(range_percents, 80, 120)
+    std_scores = _score_from_percent_vec(std_percents, 70, 130)
+    # Weighted average: range is more important than std
+    return np.round(range_scores * 0.7 + std_scores * 0.3, 1)
+
+
+def calculate_intonation_score(audio: AudioInput) -> float:
     """
     Calculate intonation score (0-100) based on pitch range and variation
     compared to native English speaker reference values.
@@ -37,74 +172,28 @@ def calculate_intonation_score(audio_path: str) -> float:
     - Pitch range: 80-120% of native
     - Pitch std: 70-130% of native
 
+    Args:
+        audio: WAV file path, in-memory WAV bytes or a parsed WavAudio
+
     Returns:
         float: Intonation score from 0 to 100
     """
     try:
-        sound = parselmouth.Sound(audio_path)
-        pitch = call(sound, "To Pitch", 0.0, 75, 600)
-
-        mean_f0 = call(pitch, "Get mean", 0, 0, "Hertz")
-        min_f0 = call(pitch, "Get minimum", 0, 0, "Hertz", "Parabolic")
-        max_f0 = call(pitch, "Get maximum", 0, 0, "Hertz", "Parabolic")
-        std_f0 = call(pitch, "Get standard deviation", 0, 0, "Hertz")
-
-        user_range = max_f0 - min_f0
-
-        # Native English speaker reference values (from research)
-        native_mean = 130.0  # Hz
-        native_range = 70.0  # Hz (max - min)
-        native_std = 30.0  # Hz
-
-        # Calculate percentages
-        pitch_range_percent = (
-            (user_range / native_range) * 100 if native_range > 0 else 0
-        )
-        pitch_std_percent = (std_f0 / native_std) * 100 if native_std > 0 else 0
-
-        # Convert percentage to 0-100 score
-        def _score_from_percent(
-            percent: float, ideal_min: float = 80, ideal_max: float = 120
-        ) -> float:
-            """
-            Convert percentage to score with penalties for being outside ideal range.
-
-            Args:
-                percent: Percentage value to convert
-                ideal_min: Minimum ideal percentage (default 80)
-                ideal_max: Maximum ideal percentage (default 120)
-
-            Returns:
-                Score from 0 to 100
-            """
-            if ideal_min <= percent <= ideal_max:
-                return 100.0
-            elif percent < ideal_min:
-                # Too flat: linear penalty
-                return max(0, 100 * (percent / ideal_min))
-            else:
-                # Too varied: gentle penalty
-                over = percent - ideal_max
-                penalty = min(50, over / 2)  # max 50 point penalty
-                return max(0, 100 - penalty)
-
-        range_score = _score_from_percent(pitch_range_percent, 80, 120)
-        std_score = _score_from_percent(pitch_std_percent, 70, 130)
-
-        # Weighted average: range is more important than std
-        intonation_score = range_score * 0.7 + std_score * 0.3
-
-        return round(intonation_score, 1)
+        percents = _pitch_percentages(audio)
+        if percents is None:
+            return 0.0
+        return float(_intonation_from_percents(*percents))
 
     except Exception as e:
         print(f"[calculate_intonation_score] Error: {e}")
         # Fallback: simple pitch-based scoring
         try:
-            sound = parselmouth.Sound(audio_path)
-            pitch_obj = sound.to_pitch()
+            pitch_obj = _get_pitch(audio)
+            if pitch_obj is None:
+                return 0.0
             values = pitch_obj.selected_array["frequency"]
-            non_zero = [x for x in values if x != 0]
-            overall_pitch = float(np.mean(non_zero)) if non_zero else 0.0
+            non_zero = values[values != 0]  # voiced frames only
+            overall_pitch = float(non_zero.mean()) if non_zero.size else 0.0
 
             # Simple normalization
             if overall_pitch <= 0:
@@ -115,3 +204,32 @@ def calculate_intonation_score(audio_path: str) -> float:
             return round(ratio * 100.0, 1)
         except Exception:
             return 0.0
+
+
+def calculate_intonation_scores_batch(audios: List[AudioInput]) -> List[float]:
+    """
+    Same as calculate_intonation_score for many recordings (e.g. lesson-level
+    recompute): pitch statistics are collected per file, then all scores are
+    computed in one vectorized pass. Files whose statistics cannot be read go
+    through calculate_intonation_score and its fallback.
+    """
+    percents = np.full((len(audios), 2), np.nan)
+    silent: list[int] = []
+    failed: list[int] = []
+    for i, audio in enumerate(audios):
+        try:
+            result = _pitch_percentages(audio)
+        except Exception:
+            failed.append(i)
+            continue
+        if result is None:
+            silent.append(i)
+        else:
+            percents[i] = result
+
+    scores = _intonation_from_percents(percents[:, 0], percents[:, 1]).tolist()
+    for i in silent:
+        scores[i] = 0.0
+    for i in failed:
+        scores[i] = calculate_intonation_score(audios[i])
+    return scores
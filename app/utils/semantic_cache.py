@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """In-memory nearest-neighbour cache keyed by sentence embeddings.
+
+    Entries live in a fixed-size ring buffer (oldest overwritten first) and
+    expire after ``ttl_seconds``. Embeddings are L2-normalized, so a lookup is
+    a single matrix-vector product over the stored vectors; for a few
+    thousand entries this is well under a millisecond and needs no ANN index.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        threshold: float = 0.95,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600,
+    ) -> None:
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._model = None
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._values: list[Any] = [None] * max_entries
+        self._next_slot = 0
+
+    def _get_model(self):
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except Exception as import_error:
+                raise RuntimeError(
+                    "Python package 'sentence-transformers' is not installed."
+                ) from import_error
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, text: str) -> np.ndarray:
+        """Blocking: run the embedding model (call it from a worker thread)."""
+        vector = self._get_model().encode(
+            text, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return np.asarray(vector, dtype=np.float32)
+
+    def lookup(self, vector: np.ndarray) -> Optional[Any]:
+        """Return the value of the most similar live entry above threshold."""
+        with self._lock:
+            if self._vectors is None:
+                return None
+            scores = self._vectors @ vector
+            scores[self._expires_at <= time.monotonic()] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._values[best]
+            return None
+
+    def add(self, vector: np.ndarray, value: Any) -> None:
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros(
+                    (self.max_entries, vector.shape[0]), dtype=np.float32
+                )
+            slot = self._next_slot
+            self._vectors[slot] = vector
+            self._values[slot] = value
+            self._expires_at[slot] = time.monotonic() + self.ttl_seconds
+            self._next_slot = (slot + 1) % self.max_entries
@@ -31,11 +31,22 @@ from app.routers import sentence_eval_router
 def register_routers(app: FastAPI):
     app.include_router(sentence_eval_router.router)
 """,
-    "app/main.py": """from fastapi import FastAPI
+    "app/main.py": """from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sentence_transformers import SentenceTransformer
+
 from app.core.config import settings
 from app.core.router_register import register_routers
 
-app = FastAPI(title=settings.APP_NAME, version=settings.VERSION)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model at startup instead of on the first request
+    app.state.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+    app.state.embedding_model.encode("warmup")
+    yield
+
+app = FastAPI(title=settings.APP_NAME, version=settings.VERSION, lifespan=lifespan)
 
 register_routers(app)
 
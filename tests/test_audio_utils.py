@@ -0,0 +1,172 @@
+import io
+import struct
+import unittest
+import wave
+
+import numpy as np
+
+from app.utils.audio_utils import (
+    WAVE_FORMAT_EXTENSIBLE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_PCM,
+    WavAudio,
+    WavFormatError,
+    as_wav_audio,
+    parse_wav,
+)
+
+SAMPLE_RATE = 16000
+
+
+def _tone(n: int = 1600) -> np.ndarray:
+    t = np.arange(n) / SAMPLE_RATE
+    return 0.5 * np.sin(2 * np.pi * 220 * t)
+
+
+def _stdlib_wav(samples: np.ndarray, sample_width: int, channels: int = 1) -> bytes:
+    if sample_width == 2:
+        frames = (samples * 32767).astype("<i2").tobytes()
+    else:
+        ints = (samples * 8388607).astype("<i4")
+        frames = b"".join(int(v).to_bytes(3, "little", signed=True) for v in ints)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(frames)
+    return buf.getvalue()
+
+
+def _riff(fmt: bytes, frames: bytes, data_size=None) -> bytes:
+    data_size = len(frames) if data_size is None else data_size
+    chunks = b"".join(
+        [b"fmt ", struct.pack("<I", len(fmt)), fmt]
+        + [b"data", struct.pack("<I", data_size), frames]
+    )
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def _fmt(format_tag: int, bits: int, channels: int = 1) -> bytes:
+    block_align = channels * bits // 8
+    return struct.pack(
+        "<HHIIHH",
+        format_tag,
+        channels,
+        SAMPLE_RATE,
+        SAMPLE_RATE * block_align,
+        block_align,
+        bits,
+    )
+
+
+def _extensible_fmt(sub_format: int, bits: int, channels: int = 1) -> bytes:
+    base = _fmt(WAVE_FORMAT_EXTENSIBLE, bits, channels)
+    guid = struct.pack("<H", sub_format) + b"\x00\x00\x00\x00\x10\x00\x80\x00"
+    guid += b"\x00\xaa\x00\x38\x9b\x71"
+    return base + struct.pack("<HHI", 22, bits, 0) + guid
+
+
+class ParseWavTest(unittest.TestCase):
+    def test_pcm16_matches_stdlib_wave(self) -> None:
+        payload = _stdlib_wav(_tone(), 2)
+        wav = parse_wav(payload)
+
+        with wave.open(io.BytesIO(payload)) as w:
+            self.assertEqual(wav.frames, w.readframes(w.getnframes()))
+            self.assertEqual(wav.sample_rate, w.getframerate())
+        self.assertEqual((wav.sample_width, wav.channels, wav.is_float), (2, 1, False))
+        self.assertIs(wav.to_pcm16(), wav.frames)
+
+    def test_pcm24(self) -> None:
+        samples = _tone()
+        wav = parse_wav(_stdlib_wav(samples, 3))
+
+        self.assertEqual(wav.bits_per_sample, 24)
+        np.testing.assert_allclose(wav.to_float_samples()[0], samples, atol=1e-6)
+        pcm16 = np.frombuffer(wav.to_pcm16(), dtype="<i2")
+        np.testing.assert_allclose(pcm16 / 32767, samples, atol=1e-4)
+
+    def test_negative_24_bit_samples_are_sign_extended(self) -> None:
+        frames = (-8388608).to_bytes(3, "little", signed=True)
+        wav = parse_wav(_riff(_fmt(WAVE_FORMAT_PCM, 24), frames))
+        self.assertEqual(wav.to_float_samples()[0, 0], -1.0)
+
+    def test_float32(self) -> None:
+        samples = _tone()
+        payload = _riff(
+            _fmt(WAVE_FORMAT_IEEE_FLOAT, 32), samples.astype("<f4").tobytes()
+        )
+        wav = parse_wav(payload)
+
+        self.assertTrue(wav.is_float)
+        np.testing.assert_allclose(wav.to_float_samples()[0], samples, atol=1e-7)
+
+    def test_extensible_header(self) -> None:
+        samples = np.stack([_tone(), -_tone()], axis=1)  # interleaved stereo
+        payload = _riff(
+            _extensible_fmt(WAVE_FORMAT_IEEE_FLOAT, 32, channels=2),
+            samples.astype("<f4").tobytes(),
+        )
+        wav = parse_wav(payload)
+
+        self.assertEqual((wav.channels, wav.is_float), (2, True))
+        np.testing.assert_allclose(wav.to_float_samples(), samples.T, atol=1e-7)
+
+    def test_streamed_data_size(self) -> None:
+        frames = (_tone() * 32767).astype("<i2").tobytes()
+        for size in (0, 0xFFFFFFFF):
+            payload = _riff(_fmt(WAVE_FORMAT_PCM, 16), frames, data_size=size)
+            self.assertEqual(parse_wav(payload).frames, frames)
+
+    def test_skips_unknown_chunks_and_partial_frames(self) -> None:
+        frames = b"\x01\x00\x02\x00\x03"  # two 16-bit samples plus a stray byte
+        payload = _riff(_fmt(WAVE_FORMAT_PCM, 16), frames)
+        # Odd-sized LIST chunk before fmt, padded to a word boundary.
+        payload = payload[:12] + b"LIST\x03\x00\x00\x00abc\x00" + payload[12:]
+
+        self.assertEqual(parse_wav(payload).frames, b"\x01\x00\x02\x00")
+
+    def test_not_riff(self) -> None:
+        for payload in (b"", b"junk" * 10, b"RIFF\x00\x00\x00\x00AVI "):
+            with self.assertRaises(WavFormatError):
+                parse_wav(payload)
+
+    def test_missing_chunks(self) -> None:
+        full = _riff(_fmt(WAVE_FORMAT_PCM, 16), b"\x00\x00")
+        without_data = full[: full.index(b"data")]
+        without_fmt = full[:12] + full[full.index(b"data") :]
+        for payload in (without_data, without_fmt):
+            with self.assertRaises(WavFormatError):
+                parse_wav(payload)
+
+    def test_unsupported_encodings(self) -> None:
+        ima_adpcm = 0x0011
+        for fmt in (
+            _fmt(ima_adpcm, 4),
+            _fmt(WAVE_FORMAT_PCM, 12),
+            _fmt(WAVE_FORMAT_IEEE_FLOAT, 16),
+            _extensible_fmt(ima_adpcm, 4),
+            _fmt(WAVE_FORMAT_EXTENSIBLE, 16),  # no sub-format
+        ):
+            with self.assertRaises(WavFormatError):
+                parse_wav(_riff(fmt, b"\x00" * 8))
+
+    def test_wav_format_error_is_value_error(self) -> None:
+        self.assertTrue(issubclass(WavFormatError, ValueError))
+
+
+class AsWavAudioTest(unittest.TestCase):
+    def test_passes_parsed_audio_through(self) -> None:
+        wav = WavAudio(
+            frames=b"\x00\x00", sample_rate=SAMPLE_RATE, sample_width=2, channels=1
+        )
+        self.assertIs(as_wav_audio(wav), wav)
+
+    def test_parses_bytes(self) -> None:
+        payload = _stdlib_wav(_tone(), 2)
+        self.assertEqual(as_wav_audio(payload), parse_wav(payload))
+
+
+if __name__ == "__main__":
+    unittest.main()
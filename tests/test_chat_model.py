@@ -0,0 +1,76 @@
+import unittest
+
+from cachetools import TTLCache
+
+from app.models.chat_model import InMemoryChatStore
+from app.schemas.chat_schema import SpeakingConfig
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class InMemoryChatStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.timer = FakeTimer()
+        self.store = InMemoryChatStore()
+        self.store._sessions = TTLCache(maxsize=10, ttl=100, timer=self.timer)
+
+    def test_get_session_restarts_ttl(self) -> None:
+        state = self.store.create_session("t", "free", SpeakingConfig())
+
+        self.timer.now = 90
+        self.assertIs(self.store.get_session(state.session_id), state)
+        # 150s after creation, but only 60s since the last access.
+        self.timer.now = 150
+        self.assertIs(self.store.get_session(state.session_id), state)
+
+    def test_idle_session_expires(self) -> None:
+        state = self.store.create_session("t", "free", SpeakingConfig())
+
+        self.timer.now = 101
+        self.assertIsNone(self.store.get_session(state.session_id))
+
+    def test_unknown_session(self) -> None:
+        self.assertIsNone(self.store.get_session("missing"))
+
+
+class SystemPromptTest(unittest.TestCase):
+    # Prompts produced before the template refactor, kept verbatim.
+    def test_full_config_prompt_unchanged(self) -> None:
+        config = SpeakingConfig(
+            scenario="Hotel",
+            level="B1",
+            userRole="guest",
+            botTone="warm",
+            goal="check in",
+        )
+        state = InMemoryChatStore().create_session("t", "free", config)
+
+        self.assertEqual(
+            state.messages[0].content,
+            "You are an English speaking practice partner. "
+            "Keep responses concise and conversational. "
+            "Always respond in English, and encourage the learner. "
+            "Scenario: Hotel. Learner level: B1. User role: guest. "
+            "Bot tone: warm. Goal: check in.",
+        )
+        self.assertEqual(state.messages[0].role, "system")
+
+    def test_empty_config_prompt_unchanged(self) -> None:
+        state = InMemoryChatStore().create_session("t", "free", SpeakingConfig())
+
+        self.assertEqual(
+            state.messages[0].content,
+            "You are an English speaking practice partner. "
+            "Keep responses concise and conversational. "
+            "Always respond in English, and encourage the learner. ",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+import google.generativeai as genai
+
+from app.utils import gemini_client
+
+
+class BindApiKeyTest(unittest.IsolatedAsyncioTestCase):
+    def test_sdk_still_has_async_client_attribute(self) -> None:
+        # _bind_api_key depends on this private attribute; if an SDK upgrade
+        # drops it, multi-key pools must be revisited.
+        model = genai.GenerativeModel(gemini_client.GEMINI_MODELS[0])
+        self.assertTrue(hasattr(model, "_async_client"))
+
+    async def test_bind_sets_per_key_client(self) -> None:
+        model = genai.GenerativeModel(gemini_client.GEMINI_MODELS[0])
+        gemini_client._bind_api_key(model, "test-key")
+
+        self.assertIs(
+            model._async_client, gemini_client._async_client_for_key("test-key")
+        )
+
+    def test_bind_rejects_sdk_without_attribute(self) -> None:
+        class NoClientModel:
+            pass
+
+        with self.assertRaises(RuntimeError):
+            gemini_client._bind_api_key(NoClientModel(), "test-key")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.utils.gemini_key_pool import GeminiKeyPool
+
+
+class GeminiKeyPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def test_no_keys_yields_none(self) -> None:
+        pool = GeminiKeyPool([])
+        async with pool.slot() as key:
+            self.assertIsNone(key)
+
+    async def test_rotates_to_least_loaded_key(self) -> None:
+        pool = GeminiKeyPool(["k1", "k2", "k1"])
+        self.assertEqual(pool.keys, ["k1", "k2"])
+
+        async with pool.slot() as first:
+            async with pool.slot() as second:
+                self.assertEqual({first, second}, {"k1", "k2"})
+                self.assertEqual(pool._in_flight, {"k1": 1, "k2": 1})
+        self.assertEqual(pool._in_flight, {"k1": 0, "k2": 0})
+
+    async def test_exclude_skips_tried_keys(self) -> None:
+        pool = GeminiKeyPool(["k1", "k2"])
+        async with pool.slot(exclude=("k1",)) as key:
+            self.assertEqual(key, "k2")
+
+    async def test_cooled_down_key_is_skipped(self) -> None:
+        pool = GeminiKeyPool(["k1", "k2"], cooldown_seconds=30)
+        pool.cool_down("k1")
+
+        self.assertTrue(pool.has_ready_key())
+        self.assertFalse(pool.has_ready_key(exclude=("k2",)))
+        for _ in range(3):
+            async with pool.slot() as key:
+                self.assertEqual(key, "k2")
+
+    async def test_all_cooling_down_uses_first_to_recover(self) -> None:
+        pool = GeminiKeyPool(["k1", "k2"], cooldown_seconds=30)
+        pool.cool_down("k2")
+        pool.cool_down("k1")  # later, so k2 recovers first
+
+        self.assertFalse(pool.has_ready_key())
+        async with pool.slot() as key:
+            self.assertEqual(key, "k2")
+
+    async def test_cooldown_expires(self) -> None:
+        pool = GeminiKeyPool(["k1"], cooldown_seconds=0)
+        pool.cool_down("k1")
+        self.assertTrue(pool.has_ready_key())
+
+    async def test_per_key_concurrency_cap(self) -> None:
+        pool = GeminiKeyPool(["k1"], max_concurrency_per_key=1)
+        release = asyncio.Event()
+        entered = []
+
+        async def hold(name: str) -> None:
+            async with pool.slot():
+                entered.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        self.assertEqual(entered, ["a"])
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(entered, ["a", "b"])
+
+
+class GeminiKeyPoolRateLimitTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch(
+            "app.utils.gemini_key_pool.time.monotonic", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unlimited_by_default(self) -> None:
+        pool = GeminiKeyPool(["k1"])
+        self.assertEqual([pool._reserve("k1") for _ in range(100)], [0.0] * 100)
+
+    def test_burst_then_even_spacing(self) -> None:
+        pool = GeminiKeyPool(["k1"], requests_per_minute=2)
+
+        self.assertEqual(pool._reserve("k1"), 0.0)
+        self.assertEqual(pool._reserve("k1"), 0.0)
+        # Bucket empty: refills one token every 30s, queued callers stack up.
+        self.assertAlmostEqual(pool._reserve("k1"), 30.0)
+        self.assertAlmostEqual(pool._reserve("k1"), 60.0)
+
+        self.now += 60
+        self.assertAlmostEqual(pool._reserve("k1"), 30.0)
+
+    def test_refill_is_capped_at_burst(self) -> None:
+        pool = GeminiKeyPool(["k1"], requests_per_minute=2)
+        self.now += 3600
+        waits = [pool._reserve("k1") for _ in range(3)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 30.0)
+
+    async def test_prefers_key_with_tokens(self) -> None:
+        pool = GeminiKeyPool(["k1", "k2"], requests_per_minute=1)
+        pool._reserve("k1")
+
+        async with pool.slot() as key:
+            self.assertEqual(key, "k2")
+
+    async def test_slot_sleeps_for_the_deficit(self) -> None:
+        pool = GeminiKeyPool(["k1"], requests_per_minute=60)
+        pool._tokens["k1"] = 0.0
+
+        with mock.patch(
+            "app.utils.gemini_key_pool.asyncio.sleep", new=mock.AsyncMock()
+        ) as sleep:
+            async with pool.slot():
+                pass
+        sleep.assert_awaited_once()
+        self.assertAlmostEqual(sleep.await_args.args[0], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import unittest
+import wave
+
+import numpy as np
+
+from app.utils import intonation_utils
+from app.utils.audio_utils import parse_wav
+
+SAMPLE_RATE = 16000
+
+
+def _wav_bytes(samples: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def _glide(seconds: float = 1.0) -> np.ndarray:
+    # A tone gliding 150 -> 250 Hz, so Praat finds a voiced, varying pitch.
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    freq = 150 + 100 * t / seconds
+    return 0.5 * np.sin(2 * np.pi * np.cumsum(freq) / SAMPLE_RATE)
+
+
+class SilentAudioTest(unittest.TestCase):
+    def assert_silent(self, audio: bytes) -> None:
+        self.assertIsNone(intonation_utils._pitch_percentages(audio))
+        self.assertEqual(intonation_utils.calculate_intonation_score(audio), 0.0)
+
+    def test_digital_silence(self) -> None:
+        self.assert_silent(_wav_bytes(np.zeros(SAMPLE_RATE)))
+
+    def test_too_short(self) -> None:
+        self.assert_silent(_wav_bytes(_glide(0.1)))
+
+    def test_noise_floor_without_voiced_pitch(self) -> None:
+        # Loud enough to pass the std check, but Praat finds no voiced frames
+        # and reports NaN statistics.
+        noise = np.random.default_rng(0).normal(0.0, 1e-3, SAMPLE_RATE)
+        self.assert_silent(_wav_bytes(noise))
+
+    def test_voiced_audio_is_scored(self) -> None:
+        audio = _wav_bytes(_glide())
+        self.assertIsNotNone(intonation_utils._pitch_percentages(audio))
+        self.assertGreater(intonation_utils.calculate_intonation_score(audio), 0.0)
+
+    def test_parsed_audio_scores_like_bytes(self) -> None:
+        audio = _wav_bytes(_glide())
+        self.assertEqual(
+            intonation_utils.calculate_intonation_score(parse_wav(audio)),
+            intonation_utils.calculate_intonation_score(audio),
+        )
+
+    def test_batch_scores_silence_as_zero(self) -> None:
+        voiced = _wav_bytes(_glide())
+        scores = intonation_utils.calculate_intonation_scores_batch(
+            [_wav_bytes(np.zeros(SAMPLE_RATE)), voiced]
+        )
+
+        self.assertEqual(scores[0], 0.0)
+        self.assertAlmostEqual(
+            scores[1], intonation_utils.calculate_intonation_score(voiced)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
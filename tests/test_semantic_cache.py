@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from app.utils.semantic_cache import SemanticCache
+
+
+def _unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class SemanticCacheLookupTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch(
+            "app.utils.semantic_cache.time.monotonic", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Vectors are built by hand, so the embedding model is never loaded.
+        self.cache = SemanticCache(
+            model_name="unused", threshold=0.95, max_entries=2, ttl_seconds=60
+        )
+
+    def test_empty_cache_misses(self) -> None:
+        self.assertIsNone(self.cache.lookup(_unit(1, 0, 0)))
+        self.assertIsNone(self.cache._model)
+
+    def test_hit_above_threshold(self) -> None:
+        self.cache.add(_unit(1, 0, 0), "a")
+        self.cache.add(_unit(0, 1, 0), "b")
+
+        self.assertEqual(self.cache.lookup(_unit(1, 0.1, 0)), "a")  # cos ~0.995
+        self.assertEqual(self.cache.lookup(_unit(0, 1, 0)), "b")
+
+    def test_miss_below_threshold(self) -> None:
+        self.cache.add(_unit(1, 0, 0), "a")
+        self.assertIsNone(self.cache.lookup(_unit(1, 0.5, 0)))  # cos ~0.894
+
+    def test_expired_entries_are_ignored(self) -> None:
+        self.cache.add(_unit(1, 0, 0), "old")
+        self.now += 30
+        self.cache.add(_unit(1, 0.05, 0), "new")
+
+        self.now += 31  # "old" is 61s old, "new" 31s
+        self.assertEqual(self.cache.lookup(_unit(1, 0, 0)), "new")
+        self.now += 30
+        self.assertIsNone(self.cache.lookup(_unit(1, 0, 0)))
+
+    def test_ring_buffer_overwrites_oldest(self) -> None:
+        self.cache.add(_unit(1, 0, 0), "a")
+        self.cache.add(_unit(0, 1, 0), "b")
+        self.cache.add(_unit(0, 0, 1), "c")  # max_entries=2: replaces "a"
+
+        self.assertIsNone(self.cache.lookup(_unit(1, 0, 0)))
+        self.assertEqual(self.cache.lookup(_unit(0, 1, 0)), "b")
+        self.assertEqual(self.cache.lookup(_unit(0, 0, 1)), "c")
+
+
+if __name__ == "__main__":
+    unittest.main()